@@ -1,65 +1,5 @@
-import os
 import sys
-import datetime
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from dotenv import load_dotenv
-import json
-
-# Load environment variables
-load_dotenv(".env.local")
-PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID")
-SCOPES = ['https://www.googleapis.com/auth/drive']
-
-def authenticate():
-    """Authenticates using User OAuth Token (Cloud/Local) or Service Account."""
-    creds = None
-    
-    # 1. Try User OAuth Token from Environment Variable (GitHub Actions / Cloud)
-    token_info = os.getenv("GOOGLE_DRIVE_TOKEN_JSON")
-    if token_info:
-        print("🔐 Authenticating via User OAuth Token (Env Var)...")
-        info = json.loads(token_info)
-        creds = Credentials.from_authorized_user_info(info, SCOPES)
-        return build('drive', 'v3', credentials=creds)
-
-    # 2. Try Local token.json
-    if os.path.exists('token.json'):
-        print("👤 Authenticating via Local token.json...")
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    # Refresh if expired
-    if creds and creds.expired and creds.refresh_token:
-        print("🔄 Refreshing expired token...")
-        try:
-            creds.refresh(Request())
-            with open('token.json', 'w') as token:
-                token.write(creds.to_json())
-        except Exception as e:
-            print(f"⚠️ Failed to refresh token: {e}")
-            creds = None
-
-    if creds and creds.valid:
-        return build('drive', 'v3', credentials=creds)
-
-    # 3. Try Service Account (Fallback)
-    service_account_info = os.getenv("GOOGLE_SERVICE_ACCOUNT_INFO")
-    if service_account_info:
-        print("🤖 Authenticating via Service Account (Env Var)...")
-        info = json.loads(service_account_info)
-        creds = service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
-        return build('drive', 'v3', credentials=creds)
-
-    # 4. Final Fallback: Full Interactive Login (Local Only)
-    print("❌ No valid credentials found. Starting interactive login...")
-    flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-    creds = flow.run_local_server(port=0)
-    with open('token.json', 'w') as token:
-        token.write(creds.to_json())
-    return build('drive', 'v3', credentials=creds)
+from drive_client import get_service, execute_batch, list_all, PARENT_FOLDER_ID
 
 def create_folder(service, name, parent_id):
     query = f"name = '{name}' and '{parent_id}' in parents and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
@@ -104,23 +44,32 @@ def archive_clips(service, slug):
     # 4. Move all files from 'clips' to 'archived'
     # EXCEPT the archived folder itself
     query = f"'{clips_folder_id}' in parents and trashed = false and mimeType != 'application/vnd.google-apps.folder'"
-    results = service.files().list(q=query, fields="files(id, name)", supportsAllDrives=True).execute()
-    files = results.get('files', [])
+    files = list_all(service, q=query, fields="files(id, name)", supportsAllDrives=True)
 
     print(f"📦 Archiving {len(files)} files...")
+    # Move file: remove current parents and add new parent (batched, up to 100 per HTTP call)
+    requests = [
+        (file['id'], service.files().update(
+            fileId=file['id'],
+            addParents=archived_folder_id,
+            removeParents=clips_folder_id,
+            fields='id, parents',
+            supportsAllDrives=True
+        ))
+        for file in files
+    ]
+    results = execute_batch(service, requests)
+
+    failed = 0
     for file in files:
-        # Move file: remove current parents and add new parent
-        try:
-            service.files().update(
-                fileId=file['id'],
-                addParents=archived_folder_id,
-                removeParents=clips_folder_id,
-                fields='id, parents',
-                supportsAllDrives=True
-            ).execute()
+        result = results.get(file['id'], {"ok": False, "error": "no response"})
+        if result["ok"]:
             print(f"   [MOV] {file['name']} -> archived/")
-        except Exception as e:
-            print(f"   [ERR] Failed to move {file['name']}: {e}")
+        else:
+            failed += 1
+            print(f"   [ERR] Failed to move {file['name']}: {result['error']}")
+    print(f"📊 Archived {len(files) - failed}/{len(files)} files")
+    return failed == 0
 
 def main():
     if len(sys.argv) < 2:
@@ -128,8 +77,9 @@ def main():
         sys.exit(1)
     
     slug = sys.argv[1]
-    service = authenticate()
-    archive_clips(service, slug)
+    service = get_service()
+    if archive_clips(service, slug) is False:
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+
+# Incrementally maintained front-matter index for content/articles/*.md.
+# Only files whose size/mtime changed since the last refresh are re-read, and then
+# only up to the closing '---' of their front matter.
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARTICLES_DIR = os.path.join(REPO_ROOT, "content", "articles")
+INDEX_PATH = os.getenv("ARTICLE_INDEX_PATH", os.path.join(REPO_ROOT, ".cache", "article_index.json"))
+INDEX_VERSION = 1
+
+FIELDS = ("title", "site_id", "category", "publishedAt")
+
+def read_front_matter(path):
+    """Parse the leading '---' YAML block as flat key: value pairs without reading the body."""
+    meta = {}
+    with open(path, "r", encoding="utf-8") as f:
+        if f.readline().strip() != "---":
+            return meta
+        for line in f:
+            if line.strip() == "---":
+                break
+            key, sep, value = line.partition(":")
+            if sep and key.strip() and not key.startswith((" ", "\t")):
+                meta[key.strip()] = value.strip().strip('"').strip("'")
+    return meta
+
+class ArticleIndex:
+    def __init__(self, articles_dir=ARTICLES_DIR, index_path=INDEX_PATH):
+        self.articles_dir = articles_dir
+        self.index_path = index_path
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("articles_dir") == self.articles_dir:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "articles_dir": self.articles_dir, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self):
+        """Sync the index with the directory. Returns the number of re-read files."""
+        seen = set()
+        changed = 0
+        for entry in os.scandir(self.articles_dir):
+            if not entry.name.endswith(".md") or not entry.is_file():
+                continue
+            st = entry.stat()
+            slug = entry.name[:-3]
+            seen.add(slug)
+            cached = self.entries.get(slug)
+            if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+                continue
+            meta = read_front_matter(entry.path)
+            self.entries[slug] = dict(
+                {field: meta.get(field, "") for field in FIELDS},
+                slug=slug,
+                path=os.path.relpath(entry.path, REPO_ROOT),
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+            )
+            changed += 1
+
+        removed = set(self.entries) - seen
+        for slug in removed:
+            del self.entries[slug]
+        if changed or removed:
+            self._save()
+        return changed
+
+    def articles(self, site_id=None, category=None):
+        """Articles filtered by brand and/or category, newest (by mtime) first."""
+        rows = [
+            e for e in self.entries.values()
+            if (site_id is None or e["site_id"] == site_id) and (category is None or e["category"] == category)
+        ]
+        rows.sort(key=lambda e: (e["mtime_ns"], e["publishedAt"]), reverse=True)
+        return rows
+
+    def latest(self, site_id):
+        rows = self.articles(site_id=site_id)
+        return rows[0] if rows else None
+
+_index = None
+
+def get_index():
+    """Process-wide index, refreshed on first use."""
+    global _index
+    if _index is None:
+        _index = ArticleIndex()
+        _index.refresh()
+    return _index
+
+if __name__ == "__main__":
+    index = ArticleIndex()
+    changed = index.refresh()
+    site_id = sys.argv[1] if len(sys.argv) > 1 else None
+    category = sys.argv[2] if len(sys.argv) > 2 else None
+    rows = index.articles(site_id, category)
+    print(f"📚 {len(index.entries)} articles indexed ({changed} re-read)", file=sys.stderr)
+    print(json.dumps(rows, ensure_ascii=False, indent=2))
@@ -1,16 +1,27 @@
 import os
 import sys
 import glob
+import json
+import time
+import datetime
+import shutil
+import hashlib
+import tempfile
+import functools
 import asyncio
+import argparse
+import subprocess
 import textwrap
 import numpy as np
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
-import edge_tts
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+import tts_cache
+import script_parser
+import slug_resolver
+import subtitle_timing
 
 # MoviePy v2 imports
-# We import everything but will use specific classes
-from moviepy import *
+# Imported inside the render functions: up-to-date slugs exit before paying for the import.
 # Note: In MoviePy v2, effects are often in 'vfx' or applied via 'with_effects'
 # but 'concatenate_videoclips' etc are top level.
 
@@ -18,134 +29,274 @@ from moviepy import *
 # --- Configuration ---
 VOICE = "ja-JP-KeitaNeural"  # Male Voice
 VIDEO_WIDTH = 1080
-VIDEO_HEIGHT = 1920
+VIDEO_HEIGHT = 1920  # both sides even: yuv420p needs it and every segment must match for concat
 
-# Usage: python3 auto_video_maker.py [slug]
+# TTS fan-out: number of edge_tts requests in flight and retries per segment
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+TTS_RETRIES = int(os.getenv("TTS_RETRIES", "3"))
 
-SLUG = sys.argv[1] if len(sys.argv) > 1 else None
-if not SLUG:
-    print("Error: Slug required.")
-    sys.exit(1)
+# Encoder settings shared by the single-pass and per-segment renderers.
+# Segments must be byte-compatible for the stream-copy concat, so never vary these per clip.
+ENCODE_PARAMS = dict(
+    fps=24,
+    codec='libx264',
+    audio_codec='aac',
+    audio_fps=44100,
+    ffmpeg_params=['-pix_fmt', 'yuv420p'],
+)
+
+# Usage: python3 auto_video_maker.py [slug] [--render-mode segments] [--workers N]
+#        python3 auto_video_maker.py slug1 slug2 ... | --since 2026-01-28  (batch, isolated scratch dirs)
 
 BASE_DIR = os.getcwd()
-SCRIPT_PATH = os.path.join(BASE_DIR, "content/scripts", f"{SLUG}.md")
 IMAGE_DIR = os.path.join(BASE_DIR, "public/images/articles")
 OUTPUT_DIR = os.path.join(BASE_DIR, "public/videos")
+LOG_DIR = os.path.join(BASE_DIR, "logs", "video")  # per-slug batch render logs, kept out of public/
 SUBTITLE_DIR = os.path.join(BASE_DIR, "content/social") # Save subtitles to social folder for easy access
-OUTPUT_FILE = os.path.join(OUTPUT_DIR, f"{SLUG}.mp4")
-SUBTITLE_FILE = os.path.join(SUBTITLE_DIR, f"【自動生成動画テロップ】{SLUG}.txt")
-
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-if not os.path.exists(SUBTITLE_DIR):
-    os.makedirs(SUBTITLE_DIR)
+FRAME_CACHE_DIR = os.getenv("FRAME_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "frames"))
+FRAME_CACHE_MAX_BYTES = int(float(os.getenv("FRAME_CACHE_MAX_MB", "512")) * 1024 * 1024)
+# Per-slug build manifest + reusable segment intermediates for incremental re-renders
+BUILD_DIR = os.getenv("VIDEO_BUILD_DIR", os.path.join(BASE_DIR, ".cache", "video"))
+RENDER_VERSION = 2  # bump to invalidate every cached segment
 
 # 3. Script Parsing
 def parse_script(file_path):
-    if not os.path.exists(file_path):
-        print(f"Script not found: {file_path}")
-        return []
-    
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    # JSON / "## Scene N" / legacy table formats, via the cached scene IR (script_parser.py)
+    ir = script_parser.load_scenes(file_path)
+    segments = [scene["narration"] for scene in ir["scenes"]]
+    if segments:
+        print(f"✅ Parsed {len(segments)} segments ({ir['format']}).")
+    return segments
+
+# 4. Audio Generation
+async def generate_audio_file(text, index, work_dir="."):
+    outfile = os.path.join(work_dir, f"tmp_voice_{index}.mp3")
+    # Served from the shared TTS cache when this text/voice was synthesized before.
+    # meta carries the stream-measured duration and WordBoundary timing.
+    meta = await tts_cache.synthesize(text, VOICE, outfile)
+    return outfile, meta
+
+async def synthesize_segments(segments, work_dir=".", concurrency=TTS_CONCURRENCY, retries=TTS_RETRIES, only=None):
+    """Synthesize segments concurrently. Returns (audio_path, meta) pairs in script order.
+
+    With only=<indices>, other segments are skipped and come back as None.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def worker(index, text):
+        async with semaphore:
+            attempts = max(1, retries)
+            for attempt in range(1, attempts + 1):
+                try:
+                    return await generate_audio_file(text, index, work_dir)
+                except Exception as e:
+                    if attempt == attempts:
+                        raise RuntimeError(f"TTS failed for segment {index + 1} after {attempts} attempts: {e}") from e
+                    wait = 2 ** (attempt - 1)
+                    print(f"  ⚠️ TTS segment {index + 1} failed ({e}). Retrying in {wait}s...")
+                    await asyncio.sleep(wait)
+
+    async def skipped():
+        return None
 
-    # Try JSON parsing first (New Brain Format)
-    import json
-    import re
+    # gather() preserves the input order regardless of completion order
+    return await asyncio.gather(*(
+        worker(i, text) if only is None or i in only else skipped()
+        for i, text in enumerate(segments)
+    ))
 
-    # Extract JSON block
-    json_match = re.search(r'```json\s*([\s\S]*?)\s*```', content)
-    if json_match:
+# 5. Ken Burns / Image Processing
+_frame_memo = {}  # img_path -> decoded 1080x1920 frame, shared by every clip that reuses the image
+
+@functools.lru_cache(maxsize=None)
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def prepare_frame(img_path):
+    """Decode, scale to cover VIDEO_WIDTH x VIDEO_HEIGHT and center-crop once per source image.
+
+    Every frame comes out exactly VIDEO_WIDTH x VIDEO_HEIGHT, so segments from any source
+    share one geometry and stream-copy concat. Frames are persisted compressed in
+    FRAME_CACHE_DIR keyed by file hash + target geometry, and memoized in-process so
+    cyclically reused images share one NumPy array.
+    """
+    if img_path in _frame_memo:
+        return _frame_memo[img_path]
+
+    cache_path = os.path.join(FRAME_CACHE_DIR, f"{file_sha256(img_path)}_{VIDEO_WIDTH}x{VIDEO_HEIGHT}.npz")
+    try:
+        with np.load(cache_path) as data:
+            frame = data["frame"]
+        os.utime(cache_path)  # LRU touch
+    except (OSError, ValueError, KeyError):
+        with Image.open(img_path) as img:
+            # Scale so both sides cover the target (height-fit, or width-fit for narrow
+            # portrait sources), then crop the overflow around the center
+            img = ImageOps.fit(img.convert("RGB"), (VIDEO_WIDTH, VIDEO_HEIGHT), Image.LANCZOS)
+            frame = np.asarray(img)
+
+        os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=FRAME_CACHE_DIR, suffix=".npz.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, frame=frame)
+        os.replace(tmp_path, cache_path)
+
+    frame.setflags(write=False)
+    _frame_memo[img_path] = frame
+    return frame
+
+def evict_frame_cache(max_bytes=FRAME_CACHE_MAX_BYTES):
+    """Drop least-recently-used frames until FRAME_CACHE_DIR fits in max_bytes."""
+    entries = []
+    total = 0
+    try:
+        names = os.listdir(FRAME_CACHE_DIR)
+    except OSError:
+        return 0
+    for name in names:
+        if not name.endswith((".npz", ".npy")):
+            continue
+        path = os.path.join(FRAME_CACHE_DIR, name)
         try:
-            json_str = json_match.group(1)
-            data = json.loads(json_str)
-            
-            audio_segments = []
-            if "scenes" in data:
-                for scene in data["scenes"]:
-                    # Brain Ver 2.0 uses "narration_text"
-                    # Brain Ver 1.0 used "audio_script"
-                    text = scene.get("narration_text") or scene.get("audio_script") or ""
-                    
-                    if text:
-                        audio_segments.append(text)
-            
-            if audio_segments:
-                print(f"✅ Parsed {len(audio_segments)} segments from JSON.")
-                return audio_segments
-        except json.JSONDecodeError as e:
-            print(f"⚠️ JSON found but failed to parse: {e}")
-
-    # Fallback to Old Markdown Table parsing
-    print("⚠️ JSON not found or invalid. Trying legacy Markdown Table parsing...")
-    lines = content.split('\n')
-    audio_segments = []
-    
-    in_table = False
-    for line in lines:
-        if "|" in line and "Audio" in line and "Visual" in line:
-            in_table = True
+            st = os.stat(path)
+        except OSError:
             continue
-        if in_table and "|" in line:
-            if "---" in line: continue
-            parts = [p.strip() for p in line.split("|")]
-            # Standard: | Time | Visual | Audio | Note | -> ["", "Time", "Vis", "Aud", "Note", ""]
-            if len(parts) >= 4:
-                audio_text = parts[3]
-                if audio_text and audio_text != "Audio":
-                    # Clean Audio text
-                    cleaned_text = re.sub(r'^(Narration\s*\d*:|Narrator:|Man:|Woman:|Visual:|Audio:)\s*', '', audio_text, flags=re.IGNORECASE)
-                    cleaned_text = cleaned_text.replace('**', '').replace('*', '')
-                    cleaned_text = cleaned_text.strip()
-                    
-                    if cleaned_text:
-                        audio_segments.append(cleaned_text)
-                    
-    return audio_segments
+        # Uncompressed .npy frames from older runs are never read again
+        entries.append((0 if name.endswith(".npy") else st.st_mtime, st.st_size, path))
+        total += st.st_size
 
-# 4. Audio Generation
-async def generate_audio_file(text, index):
-    outfile = f"tmp_voice_{index}.mp3"
-    communicate = edge_tts.Communicate(text, VOICE)
-    await communicate.save(outfile)
-    return outfile
+    removed = 0
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes and mtime:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+        removed += 1
+    return removed
 
-# 5. Ken Burns / Image Processing
 def process_image_for_clip(img_path, duration):
-    # Load Image
-    clip = ImageClip(img_path).with_duration(duration)
-    
-    # Resize to occupy height (Vertical Video)
-    # We want to fill 1080x1920
-    # First resize to height=1920
-    clip = clip.resized(height=VIDEO_HEIGHT)
-    
-    # Crop Center to 1080
-    w = clip.w
-    if w > VIDEO_WIDTH:
-        x_center = w / 2
-        clip = clip.cropped(x1=x_center - VIDEO_WIDTH/2, y1=0, width=VIDEO_WIDTH, height=VIDEO_HEIGHT)
-    
-    return clip
+    from moviepy import ImageClip
+    # Frame is already VIDEO_WIDTH x VIDEO_HEIGHT; no per-clip resampling
+    return ImageClip(prepare_frame(img_path)).with_duration(duration)
+
+# 6. Per-Segment Rendering (process pool + stream-copy concat)
+def render_segment(job):
+    """Encode one image+narration segment to its own MP4. Runs in a worker process."""
+    from moviepy import AudioFileClip
+    index, img_path, audio_path, out_path = job
+    audio_clip = AudioFileClip(audio_path)
+    duration = audio_clip.duration
+    segment = process_image_for_clip(img_path, duration).with_audio(audio_clip)
+    segment.write_videofile(out_path, threads=1, logger=None, **ENCODE_PARAMS)
+    segment.close()
+    audio_clip.close()
+    return index, out_path, duration
+
+def get_ffmpeg_exe():
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return "ffmpeg"
+
+def concat_segments(segment_paths, output_file):
+    """Join identically-encoded segments without re-encoding (ffmpeg concat demuxer)."""
+    list_path = output_file + ".concat.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        subprocess.run(
+            [get_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+             "-i", list_path, "-c", "copy", "-movflags", "+faststart", output_file],
+            check=True,
+        )
+    finally:
+        os.remove(list_path)
+
+def render_segments_parallel(jobs, workers):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_segment, job) for job in jobs]
+        for future in as_completed(futures):
+            index, out_path, duration = future.result()
+            done += 1
+            print(f"  [{done}/{len(jobs)}] Encoded segment {index + 1} ({duration:.1f}s)")
+
+# 6b. Incremental Build Manifest
+def segment_hash(text, image_hash):
+    """Everything that affects one rendered segment: narration, voice, source image, render settings."""
+    payload = json.dumps({
+        "text": text,
+        "voice": VOICE,
+        "image": image_hash,
+        "size": [VIDEO_WIDTH, VIDEO_HEIGHT],
+        "encode": ENCODE_PARAMS,
+        "version": RENDER_VERSION,
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_build_manifest(slug):
+    try:
+        with open(os.path.join(BUILD_DIR, slug, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_build_manifest(slug, manifest):
+    path = os.path.join(BUILD_DIR, slug, "manifest.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def output_stamps(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamps[path] = [st.st_size, st.st_mtime_ns]
+    return stamps
 
 # --- MAIN ---
-async def main():
-    print(f"🎬 Starting Video Engine V3 (Clean) for: {SLUG}")
+async def main(slug, render_mode="single", workers=None, work_dir=".", force=False):
+    script_path = os.path.join(BASE_DIR, slug_resolver.resolve_or_default("scripts", slug))
+    output_file = os.path.join(OUTPUT_DIR, f"{slug}.mp4")
+    subtitle_file = os.path.join(SUBTITLE_DIR, f"【自動生成動画テロップ】{slug}.txt")
+    srt_file = os.path.join(SUBTITLE_DIR, f"{slug}.srt")
+    outputs = [output_file, subtitle_file, srt_file]
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(SUBTITLE_DIR, exist_ok=True)
+
+    print(f"🎬 Starting Video Engine V3 (Clean) for: {slug}")
     print(f"🎙️  Voice: {VOICE}")
     
     # 1. Get Segments
-    segments = parse_script(SCRIPT_PATH)
+    segments = parse_script(script_path)
     if not segments:
         print("No script segments found!")
-        return
+        return False
 
     # 2. Get Images (Support Folder Structure)
     # Check public/images/articles/[SLUG]/*.webp
-    images = glob.glob(os.path.join(IMAGE_DIR, SLUG, "*.webp"))
+    images = glob.glob(os.path.join(IMAGE_DIR, slug, "*.webp"))
     
     # Fallback: Check flat files in public/images/articles/[SLUG]*.webp
     if not images:
-        images = glob.glob(os.path.join(IMAGE_DIR, f"{SLUG}*.webp"))
+        images = glob.glob(os.path.join(IMAGE_DIR, f"{slug}*.webp"))
         
     if not images:
         # Fallback 2: Check any webp in root of articles? (Maybe generic?)
@@ -155,53 +306,131 @@ async def main():
     
     if not images:
         print("No images found!")
-        return
+        return False
+
+    # 3. Build Manifest: hash each segment's inputs and skip whatever is unchanged
+    segment_images = [images[i % len(images)] for i in range(len(segments))]
+    hashes = [segment_hash(text, file_sha256(img)) for text, img in zip(segments, segment_images)]
+    build_hash = hashlib.sha256(json.dumps([render_mode] + hashes).encode("utf-8")).hexdigest()
+    manifest = {} if force else load_build_manifest(slug)
+
+    if manifest.get("build_hash") == build_hash and manifest.get("outputs") == output_stamps(outputs):
+        print("✅ Up to date, nothing to render.")
+        return True
+
+    previous = {seg["hash"]: seg for seg in manifest.get("segments", [])}
+    segment_dir = os.path.join(BUILD_DIR, slug, "segments")
+    segment_paths = [os.path.join(segment_dir, f"{h[:16]}.mp4") for h in hashes]
+    # Single mode keeps each segment's narration instead, since its timeline is re-encoded as a whole
+    audio_dir = os.path.join(BUILD_DIR, slug, "audio")
+    kept_audio = [os.path.join(audio_dir, f"{h[:16]}.mp3") for h in hashes]
+    intermediates = segment_paths if render_mode == "segments" else kept_audio
+    # Reuse intermediates whose inputs did not change; only the rest is re-synthesized (and, in
+    # segments mode, re-encoded)
+    todo = {i for i, h in enumerate(hashes) if h not in previous or not os.path.exists(intermediates[i])}
+    print(f"♻️  {len(segments) - len(todo)} unchanged / {len(todo)} to render")
+
+    # Preprocess each distinct source frame once; clips and render workers reuse it
+    used_images = sorted({segment_images[i] for i in todo})
+    print(f"Preparing {len(used_images)} frames...")
+    for img_path in used_images:
+        prepare_frame(img_path)
+    evict_frame_cache()
 
     final_clips = []
     temp_files = []
-    subtitle_lines = []
 
-    print(f"Processing {len(segments)} segments...")
+    print(f"Synthesizing {len(todo)} segments (concurrency={TTS_CONCURRENCY})...")
+    narration = await synthesize_segments(segments, work_dir, only=todo)
+    audio_paths = [item[0] if item else None for item in narration]
+    temp_files.extend(p for p in audio_paths if p)
+    segment_meta = [item[1] if item else previous[hashes[i]] for i, item in enumerate(narration)]
+    cache = tts_cache.get_cache()
+    if cache:
+        print(f"🗄️  TTS cache: {cache.stats()}")
 
-    for i, text in enumerate(segments):
-        # A. Audio
-        audio_path = await generate_audio_file(text, i)
-        temp_files.append(audio_path)
-        
-        # Load Audio Clip to get duration
-        audio_clip = AudioFileClip(audio_path)
-        duration = audio_clip.duration
-        
-        # B. Image (Cycle)
-        img_path = images[i % len(images)]
-        img_clip = process_image_for_clip(img_path, duration)
-        
-        # C. Composite (No Captions)
-        # Just Image with Audio
-        video_segment = img_clip.with_audio(audio_clip)
-        
-        final_clips.append(video_segment)
-        subtitle_lines.append(text)
-        print(f"  [{i+1}/{len(segments)}] Generated clip ({duration:.1f}s): {text[:20]}...")
+    subtitle_lines = list(segments)
 
-    # 3. Concatenate
-    print("Combining clips...")
-    final_video = concatenate_videoclips(final_clips)
-    
-    # 4. Write Video File
-    print(f"Writing to {OUTPUT_FILE}...")
-    final_video.write_videofile(
-        OUTPUT_FILE, 
-        fps=24, 
-        codec='libx264', 
-        audio_codec='aac',
-        threads=4
-    )
+    if render_mode == "segments":
+        # Each segment is encoded independently across cores, then joined without re-encoding
+        workers = workers or os.cpu_count() or 1
+        os.makedirs(segment_dir, exist_ok=True)
+        jobs = {}
+        for i in sorted(todo):
+            # Identical text+image pairs share one intermediate
+            jobs.setdefault(segment_paths[i], (i, segment_images[i], audio_paths[i], segment_paths[i]))
+        print(f"Rendering {len(jobs)} segments on {workers} workers...")
+        if jobs:
+            render_segments_parallel(list(jobs.values()), workers)
+
+        print("Joining segments (stream copy)...")
+        concat_segments(segment_paths, output_file)
+
+        # Drop intermediates no longer referenced by the script
+        for name in os.listdir(segment_dir):
+            if os.path.join(segment_dir, name) not in segment_paths:
+                os.remove(os.path.join(segment_dir, name))
+    else:
+        from moviepy import AudioFileClip, concatenate_videoclips
+
+        os.makedirs(audio_dir, exist_ok=True)
+        for i in todo:
+            shutil.copyfile(audio_paths[i], kept_audio[i])
+        for name in os.listdir(audio_dir):
+            if os.path.join(audio_dir, name) not in kept_audio:
+                os.remove(os.path.join(audio_dir, name))
+
+        print(f"Processing {len(segments)} segments...")
+
+        for i, text in enumerate(segments):
+            # A. Audio (fresh or kept from the previous build)
+            audio_path = kept_audio[i]
+            
+            # Load Audio Clip to get duration
+            audio_clip = AudioFileClip(audio_path)
+            duration = audio_clip.duration
+            
+            # B. Image (Cycle)
+            img_path = segment_images[i]
+            img_clip = process_image_for_clip(img_path, duration)
+            
+            # C. Composite (No Captions)
+            # Just Image with Audio
+            video_segment = img_clip.with_audio(audio_clip)
+            
+            final_clips.append(video_segment)
+            print(f"  [{i+1}/{len(segments)}] Generated clip ({duration:.1f}s): {text[:20]}...")
+
+        # 3. Concatenate
+        print("Combining clips...")
+        final_video = concatenate_videoclips(final_clips)
+        
+        # 4. Write Video File
+        print(f"Writing to {output_file}...")
+        final_video.write_videofile(output_file, threads=4, **ENCODE_PARAMS)
     
     # 5. Write Subtitle File
-    print(f"Writing subtitles to {SUBTITLE_FILE}...")
-    with open(SUBTITLE_FILE, "w", encoding="utf-8") as f:
+    print(f"Writing subtitles to {subtitle_file}...")
+    with open(subtitle_file, "w", encoding="utf-8") as f:
         f.write("\n\n".join(subtitle_lines))
+
+    # Word-timed track: each segment's words shifted by the narration that precedes it
+    words, offset = [], 0.0
+    for meta in segment_meta:
+        words += subtitle_timing.offset_words(meta["words"], offset)
+        offset += meta["duration"]
+    cue_count = subtitle_timing.write_subtitles(srt_file, words)
+    print(f"Writing {cue_count} timed cues to {srt_file}...")
+
+    save_build_manifest(slug, {
+        "build_hash": build_hash,
+        "render_mode": render_mode,
+        "segments": [
+            {"hash": h, "image": img, "duration": meta["duration"], "words": meta["words"]}
+            for h, img, meta in zip(hashes, segment_images, segment_meta)
+        ],
+        "outputs": output_stamps(outputs),
+    })
         
     print("✅ Video Generation V3 Complete!")
     
@@ -209,8 +438,100 @@ async def main():
     for f in temp_files:
         if os.path.exists(f):
             os.remove(f)
+    return True
+
+# 7. Batch Rendering (many slugs, isolated scratch directories)
+def scratch_root():
+    """Prefer a RAM-backed filesystem for per-job scratch space."""
+    for candidate in (os.getenv("VIDEO_SCRATCH_DIR"), "/dev/shm"):
+        if candidate and os.path.isdir(candidate) and os.access(candidate, os.W_OK):
+            return candidate
+    return None  # tempfile default
+
+def scripts_changed_since(since):
+    """Slugs of content/scripts/*.md modified at or after an ISO date/datetime."""
+    cutoff = datetime.datetime.fromisoformat(since).timestamp()
+    paths = glob.glob(os.path.join(BASE_DIR, "content/scripts", "*.md"))
+    return sorted(Path(p).stem for p in paths if os.path.getmtime(p) >= cutoff)
+
+def render_job(slug, render_mode, workers, timeout, force=False):
+    """Render one slug in its own interpreter and scratch dir. Returns a summary row."""
+    work_dir = tempfile.mkdtemp(prefix=f"video_{slug}_", dir=scratch_root())
+    log_path = os.path.join(LOG_DIR, f"{slug}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    cmd = [sys.executable, os.path.abspath(__file__), slug, "--render-mode", render_mode, "--work-dir", work_dir]
+    if workers:
+        cmd += ["--workers", str(workers)]
+    if force:
+        cmd.append("--force")
+
+    started = time.time()
+    try:
+        with open(log_path, "w", encoding="utf-8") as log:
+            proc = subprocess.run(cmd, cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+        status = "success" if proc.returncode == 0 else "failure"
+        error = None if proc.returncode == 0 else f"exit code {proc.returncode}"
+    except subprocess.TimeoutExpired:
+        status, error = "failure", f"timeout after {timeout}s"
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {"slug": slug, "status": status, "seconds": round(time.time() - started, 1), "error": error, "log": log_path}
+
+def run_batch(slugs, render_mode, jobs, workers, timeout, summary_path=None, force=False):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    jobs = max(1, min(jobs, len(slugs)))
+    # Split the cores between concurrent jobs so segment pools don't oversubscribe the host
+    workers = workers or max(1, (os.cpu_count() or 1) // jobs)
+    print(f"🎬 Batch rendering {len(slugs)} slugs ({jobs} jobs x {workers} workers, mode={render_mode})")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(render_job, slug, render_mode, workers, timeout, force): slug for slug in slugs}
+        for future in as_completed(futures):
+            row = future.result()
+            results.append(row)
+            icon = "✅" if row["status"] == "success" else "❌"
+            print(f"  {icon} {row['slug']} ({row['seconds']}s){' - ' + row['error'] if row['error'] else ''}")
+
+    results.sort(key=lambda r: slugs.index(r["slug"]))
+    failed = [r for r in results if r["status"] != "success"]
+    print(f"📊 Batch complete: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+    if summary_path:
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "failed": len(failed)}, f, ensure_ascii=False, indent=2)
+        print(f"📝 Summary written to {summary_path}")
+    return not failed
 
 if __name__ == "__main__":
-    if sys.platform == "win32":
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Render a narrated vertical video from a script.")
+    parser.add_argument("slugs", nargs="*", help="Script slug(s) (content/scripts/<slug>.md). Several slugs run as a batch")
+    parser.add_argument("--since", help="Batch-render every script modified since this ISO date/datetime")
+    parser.add_argument("--render-mode", choices=["single", "segments"], default=os.getenv("RENDER_MODE", "single"),
+                        help="single: one MoviePy timeline encode. segments: per-segment encode on a process pool + stream-copy concat")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes for --render-mode segments (default: CPU count)")
+    parser.add_argument("--work-dir", default=".", help="Scratch directory for intermediate audio/video files")
+    parser.add_argument("--jobs", type=int, default=2, help="Slugs rendered concurrently in batch mode")
+    parser.add_argument("--timeout", type=int, default=1800, help="Per-slug timeout in seconds for batch mode")
+    parser.add_argument("--summary", help="Write the batch summary as JSON to this path")
+    parser.add_argument("--force", action="store_true", help="Ignore the build manifest and re-render everything")
+    args = parser.parse_args()
+
+    slugs = list(args.slugs)
+    if args.since:
+        slugs += [s for s in scripts_changed_since(args.since) if s not in slugs]
+    if not slugs:
+        if args.since:
+            print(f"No scripts changed since {args.since}.")
+            sys.exit(0)
+        print("Error: Slug required.")
+        sys.exit(1)
+
+    if len(slugs) > 1 or args.since:
+        ok = run_batch(slugs, args.render_mode, args.jobs, args.workers, args.timeout, args.summary, args.force)
+    else:
+        if sys.platform == "win32":
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        ok = asyncio.run(main(slugs[0], args.render_mode, args.workers, args.work_dir, args.force))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,87 @@
+import os
+import functools
+
+# Brand context compiled once per process.
+#
+# The bible / editor guide are read once, the Expert Box label is extracted once, and
+# the brand-dependent part of the polish prompt is rendered into a byte-stable prefix.
+# Every article for the same brand shares that prefix, so call_claude() can mark it
+# with cache_control and the provider only bills/processes it in full on the first call.
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BIBLES_DIR = os.path.join(REPO_ROOT, "libs", "brain", "bibles")
+EDITOR_PATH = os.path.join(REPO_ROOT, "libs", "brain", "article_editor.md")
+TITANS_PATH = os.path.join(REPO_ROOT, "libs", "brain", "titans_knowledge.md")
+
+DEFAULT_EXPERT_LABEL = "【30年のプロの眼】"
+
+def bible_path(site_id):
+    return os.path.join(BIBLES_DIR, f"{site_id}_bible.md")
+
+@functools.lru_cache(maxsize=None)
+def read_text(path):
+    """File contents, or "" if missing. Cached for the life of the process."""
+    if not os.path.exists(path):
+        return ""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def extract_expert_label(bible):
+    for line in bible.split('\n'):
+        if "Expert Boxラベル" in line or "Expert Box Label" in line:
+            label = line.split(':')[-1].strip().strip('*')
+            if label:
+                return label
+    return DEFAULT_EXPERT_LABEL
+
+class BrandContext:
+    def __init__(self, site_id):
+        self.site_id = site_id
+        self.bible = read_text(bible_path(site_id))
+        if not self.bible:
+            print(f"⚠️ Warning: Bible for {site_id} not found at {os.path.relpath(bible_path(site_id), REPO_ROOT)}")
+        self.editor = read_text(EDITOR_PATH)
+        self.expert_label = extract_expert_label(self.bible)
+        self.polish_prefix = self._render_polish_prefix()
+
+    def _render_polish_prefix(self):
+        return f"""
+    You are an expert editor specializing in the following brand:
+
+    --- BRAND BIBLE ---
+    {self.bible}
+
+    --- WRITING STYLE GUIDE ---
+    {self.editor}
+
+    --- TASK ---
+    Take the provided RAW CONTENT and restructure it into high-quality HTML format exactly as defined in the WRITING STYLE GUIDE.
+
+    【Rules】
+    1. **Strict Tone**: Use the persona and tone defined in the BRAND BIBLE.
+    2. **HTML Only**: Use standard HTML tags (h2, h3, p, ul, li, strong, table).
+    3. **Expert Box**: Extract the most critical insight/verdict and wrap it in: <div class="expert-box">{self.expert_label}...</div>
+    4. **Image Placeholders**: Check the markers [IMAGE_1], [IMAGE_2], [IMAGE_3] in the content. Replace them with:
+       - <div class="image-wrapper"><img src="IMAGE_ID_1" alt="[Scene Description]"></div> (after Lead)
+       - <div class="image-wrapper"><img src="IMAGE_ID_2" alt="[Scene Description]"></div> (middle)
+       - <div class="image-wrapper"><img src="IMAGE_ID_3" alt="[Scene Description]"></div> (before Conclusion)
+    5. **Frontmatter**: Preserve the original YAML frontmatter if present.
+
+    """
+
+    def polish_body(self, raw_content):
+        """Per-article tail of the polish prompt (everything after the cached prefix)."""
+        return f"""【RAW CONTENT】
+    {raw_content}
+
+    【OUTPUT】
+    Output ONLY the polished content.
+    """
+
+@functools.lru_cache(maxsize=None)
+def get_brand_context(site_id):
+    return BrandContext(site_id)
+
+def load_bible(site_id, fallback=TITANS_PATH):
+    """Brand bible text, falling back to the general titans knowledge when missing."""
+    return read_text(bible_path(site_id)) or read_text(fallback)
@@ -19,9 +19,11 @@ TEMP_AUDIO_PATH="$VIDEO_GENERATOR_DIR/public/audio.mp3"
 FINAL_VIDEO_PATH="$OUTPUT_DIR/${SLUG}.mp4"
 SCRIPT_JSON_PATH="$VIDEO_GENERATOR_DIR/src/video-script.json" # Target path for Bundling
 PROMPTS_TXT_PATH="content/prompts/${SLUG}_video_prompts.txt"
+SUBTITLE_PATH="content/social/${SLUG}_narration.srt"
 
 mkdir -p "$OUTPUT_DIR"
 mkdir -p "content/prompts"
+mkdir -p "content/social"
 
 echo "🧠 1. Running Video Director Brain..."
 # Output JSON to the source dir of Remotion application so it gets bundled
@@ -37,13 +39,12 @@ NARRATION_TEXT=$(node scripts/get_narration.js "$SCRIPT_JSON_PATH")
 
 # ... existing TTS generation ...
 source "$VIDEO_GENERATOR_DIR/venv/bin/activate"
-python "$VIDEO_GENERATOR_DIR/generate_voice.py" --text "$NARRATION_TEXT" --output "$TEMP_AUDIO_PATH" --voice "ja-JP-KeitaNeural"
-
-echo "⏱️ 2b. Measuring Audio Duration..."
-AUDIO_DURATION=$(python scripts/measure_audio.py "$TEMP_AUDIO_PATH")
+# Duration and word-timed subtitles are captured during synthesis (no separate measure step)
+AUDIO_DURATION=$(python "$VIDEO_GENERATOR_DIR/generate_voice.py" --text "$NARRATION_TEXT" --output "$TEMP_AUDIO_PATH" --voice "ja-JP-KeitaNeural" --subtitles "$SUBTITLE_PATH" --print-duration)
 echo "   Audio Length: ${AUDIO_DURATION}s"
+echo "   Subtitles: $SUBTITLE_PATH"
 
-echo "📝 2c. Updating Video Script Duration..."
+echo "📝 2b. Updating Video Script Duration..."
 node scripts/update_json_duration.js "$SCRIPT_JSON_PATH" "$AUDIO_DURATION"
 
 echo "🎬 3. Rendering Video..."
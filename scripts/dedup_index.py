@@ -0,0 +1,195 @@
+import os
+import re
+import sys
+import json
+import zlib
+import random
+import unicodedata
+
+from section_digest import strip_front_matter
+
+# Near-duplicate index for content/articles/*.md (MinHash + LSH over character n-grams).
+#
+# Japanese has no spaces, so bodies are normalized (front matter, HTML and Markdown
+# removed, NFKC, whitespace dropped) and shingled into overlapping character n-grams.
+# Each article gets a NUM_PERM MinHash signature, split into BANDS bands of ROWS rows;
+# articles sharing any band bucket are candidates and are confirmed by the estimated
+# Jaccard similarity. Signatures are persisted and only recomputed for files whose
+# size/mtime changed, and a lookup for an indexed slug is just BANDS dict probes.
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARTICLES_DIR = os.path.join(REPO_ROOT, "content", "articles")
+INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", os.path.join(REPO_ROOT, ".cache", "dedup_index.json"))
+THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.6"))
+
+SHINGLE = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+PRIME = (1 << 61) - 1
+INDEX_VERSION = 1
+
+_rng = random.Random(20260201)  # fixed seed: signatures must be comparable across runs
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+
+MARKUP = re.compile(r'<[^>]+>|!\[[^\]]*\]\([^)]*\)|[#*_>`|\-\[\]()]')
+
+def normalize(text):
+    text = MARKUP.sub('', strip_front_matter(text))
+    text = unicodedata.normalize('NFKC', text).lower()
+    return re.sub(r'\s+', '', text)
+
+def shingles(text):
+    text = normalize(text)
+    if len(text) <= SHINGLE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+def signature(text):
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingles(text)]
+    if not hashes:
+        return [PRIME] * NUM_PERM
+    return [min((a * h + b) % PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+def band_keys(sig):
+    return [f"{band}:{zlib.crc32(repr(sig[band * ROWS:(band + 1) * ROWS]).encode())}" for band in range(BANDS)]
+
+class DedupIndex:
+    def __init__(self, articles_dir=ARTICLES_DIR, index_path=INDEX_PATH):
+        self.articles_dir = articles_dir
+        self.index_path = index_path
+        self.entries = {}
+        self.buckets = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("params") == [SHINGLE, NUM_PERM, BANDS]:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+        for slug, entry in self.entries.items():
+            self._add_buckets(slug, entry["sig"])
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "params": [SHINGLE, NUM_PERM, BANDS], "entries": self.entries}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _add_buckets(self, slug, sig):
+        for key in band_keys(sig):
+            self.buckets.setdefault(key, set()).add(slug)
+
+    def _remove_buckets(self, slug, sig):
+        for key in band_keys(sig):
+            members = self.buckets.get(key)
+            if members:
+                members.discard(slug)
+                if not members:
+                    del self.buckets[key]
+
+    def refresh(self):
+        """Sync with the articles directory. Returns the number of (re)hashed files."""
+        seen = set()
+        changed = 0
+        for entry in os.scandir(self.articles_dir):
+            if not entry.name.endswith(".md") or not entry.is_file():
+                continue
+            st = entry.stat()
+            slug = entry.name[:-3]
+            seen.add(slug)
+            cached = self.entries.get(slug)
+            if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+                continue
+            with open(entry.path, "r", encoding="utf-8") as f:
+                sig = signature(f.read())
+            if cached:
+                self._remove_buckets(slug, cached["sig"])
+            self.entries[slug] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sig": sig}
+            self._add_buckets(slug, sig)
+            changed += 1
+
+        removed = set(self.entries) - seen
+        for slug in removed:
+            self._remove_buckets(slug, self.entries.pop(slug)["sig"])
+        if changed or removed:
+            self._save()
+        return changed
+
+    def query_signature(self, sig, threshold=THRESHOLD, exclude=None):
+        """[(slug, similarity)] above threshold, most similar first."""
+        candidates = set()
+        for key in band_keys(sig):
+            candidates |= self.buckets.get(key, set())
+        candidates.discard(exclude)
+        matches = [(slug, similarity(sig, self.entries[slug]["sig"])) for slug in candidates]
+        return sorted([m for m in matches if m[1] >= threshold], key=lambda m: -m[1])
+
+    def query_text(self, text, threshold=THRESHOLD):
+        return self.query_signature(signature(text), threshold)
+
+    def duplicates_of(self, slug, threshold=THRESHOLD):
+        entry = self.entries.get(slug)
+        if not entry:
+            return []
+        return self.query_signature(entry["sig"], threshold, exclude=slug)
+
+    def clusters(self, threshold=THRESHOLD):
+        """Groups of mutually reachable near-duplicates (sorted slugs), largest first."""
+        seen = set()
+        groups = []
+        for slug in sorted(self.entries):
+            if slug in seen:
+                continue
+            group, stack = set(), [slug]
+            while stack:
+                current = stack.pop()
+                if current in group:
+                    continue
+                group.add(current)
+                stack.extend(s for s, _ in self.duplicates_of(current, threshold) if s not in group)
+            seen |= group
+            if len(group) > 1:
+                groups.append(sorted(group))
+        return sorted(groups, key=len, reverse=True)
+
+_index = None
+
+def get_index():
+    """Process-wide index, refreshed on first use."""
+    global _index
+    if _index is None:
+        _index = DedupIndex()
+        _index.refresh()
+    return _index
+
+def canonical_duplicate(slug, threshold=THRESHOLD):
+    """The earlier article this slug nearly duplicates, or None. Slugs are date-prefixed,
+    so the lexicographically smaller slug is the one published first."""
+    earlier = [s for s, _ in get_index().duplicates_of(slug, threshold) if s < slug]
+    return min(earlier) if earlier else None
+
+if __name__ == "__main__":
+    index = DedupIndex()
+    changed = index.refresh()
+    print(f"🧬 {len(index.entries)} articles indexed ({changed} re-hashed)", file=sys.stderr)
+    if len(sys.argv) > 1:
+        target = sys.argv[1]
+        slug = os.path.basename(target)[:-3] if target.endswith(".md") else target
+        if slug in index.entries:
+            matches = index.duplicates_of(slug)
+        else:
+            with open(target, "r", encoding="utf-8") as f:
+                matches = index.query_text(f.read())
+        print(json.dumps([{"slug": s, "similarity": round(sim, 3)} for s, sim in matches], ensure_ascii=False, indent=2))
+        # Exit 2 flags a near-duplicate for shell/Node callers
+        sys.exit(2 if matches else 0)
+    print(json.dumps(index.clusters(), ensure_ascii=False, indent=2))
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import threading
+import urllib.request
+
+import httplib2
+import google_auth_httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpRequest
+from google.oauth2 import service_account
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.transport.requests import Request
+from dotenv import load_dotenv
+
+# Shared Google Drive client for the Drive scripts.
+#
+# - Credentials are resolved once per process (env OAuth token -> token.json -> service
+#   account -> interactive login) and reused; google-auth refreshes them in place.
+# - The Drive v3 discovery document is read from a local cache (seeded from the copy
+#   bundled with google-api-python-client), so building the service needs no network
+#   round-trip.
+# - get_service() returns one process-wide service. httplib2.Http is not thread-safe, so
+#   every request gets the calling thread's own AuthorizedHttp via requestBuilder, which
+#   makes the service safe to use from a thread pool.
+
+load_dotenv(".env.local")
+if not os.getenv("GOOGLE_DRIVE_FOLDER_ID"):
+    load_dotenv()
+
+SCOPES = ['https://www.googleapis.com/auth/drive']
+PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID")
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DISCOVERY_CACHE = os.getenv("DRIVE_DISCOVERY_CACHE", os.path.join(REPO_ROOT, ".cache", "drive_v3_discovery.json"))
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/drive/v3/rest"
+HTTP_TIMEOUT = int(os.getenv("DRIVE_HTTP_TIMEOUT", "120"))
+
+_lock = threading.Lock()
+_local = threading.local()
+_credentials = None
+_service = None
+
+def _save_token(creds):
+    with open('token.json', 'w') as token:
+        token.write(creds.to_json())
+
+def load_credentials():
+    """Authenticates using User OAuth Token (Cloud/Local) or Service Account."""
+    creds = None
+
+    # 1. Try User OAuth Token from Environment Variable (GitHub Actions / Cloud)
+    token_info = os.getenv("GOOGLE_DRIVE_TOKEN_JSON")
+    if token_info:
+        print("🔐 Authenticating via User OAuth Token (Env Var)...")
+        return Credentials.from_authorized_user_info(json.loads(token_info), SCOPES)
+
+    # 2. Try Local token.json
+    if os.path.exists('token.json'):
+        print("👤 Authenticating via Local token.json...")
+        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+
+    # Refresh if expired
+    if creds and creds.expired and creds.refresh_token:
+        print("🔄 Refreshing expired token...")
+        try:
+            creds.refresh(Request())
+            _save_token(creds)
+        except Exception as e:
+            print(f"⚠️ Failed to refresh token: {e}")
+            creds = None
+
+    if creds and creds.valid:
+        return creds
+
+    # 3. Try Service Account
+    service_account_info = os.getenv("GOOGLE_SERVICE_ACCOUNT_INFO")
+    service_account_path = 'service_account_key.json'
+
+    if service_account_info:
+        print("🤖 Authenticating via Service Account (Env Var)...")
+        return service_account.Credentials.from_service_account_info(json.loads(service_account_info), scopes=SCOPES)
+    if os.path.exists(service_account_path):
+        print("🤖 Authenticating via Service Account (Key File)...")
+        return service_account.Credentials.from_service_account_file(service_account_path, scopes=SCOPES)
+
+    # 4. Final Fallback: Full Interactive Login (Local Only)
+    print("❌ No valid credentials found. Starting interactive login...")
+    if not os.path.exists('credentials.json'):
+        print("❌ Error: credentials.json not found.")
+        sys.exit(1)
+
+    flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
+    creds = flow.run_local_server(port=0)
+    _save_token(creds)
+    return creds
+
+def get_credentials():
+    global _credentials
+    with _lock:
+        if _credentials is None:
+            _credentials = load_credentials()
+        return _credentials
+
+def discovery_document():
+    """Drive v3 discovery JSON: local cache -> bundled static copy -> network (then cached)."""
+    try:
+        with open(DISCOVERY_CACHE, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    doc = None
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        doc = get_static_doc('drive', 'v3')
+    except ImportError:
+        pass
+    if not doc:
+        with urllib.request.urlopen(DISCOVERY_URL, timeout=30) as response:
+            doc = response.read().decode('utf-8')
+
+    os.makedirs(os.path.dirname(DISCOVERY_CACHE), exist_ok=True)
+    tmp_path = f"{DISCOVERY_CACHE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(doc)
+    os.replace(tmp_path, DISCOVERY_CACHE)
+    return doc
+
+def thread_http():
+    """This thread's AuthorizedHttp (one connection pool per thread, shared credentials)."""
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = google_auth_httplib2.AuthorizedHttp(get_credentials(), http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        _local.http = http
+    return http
+
+def _build_request(http, *args, **kwargs):
+    # Ignore the service-level http and bind the request to the calling thread's transport
+    return HttpRequest(thread_http(), *args, **kwargs)
+
+def get_service():
+    """Process-wide Drive v3 service, safe to share across threads."""
+    global _service
+    # Resolve credentials and this thread's transport before taking _lock:
+    # thread_http() -> get_credentials() acquires the same (non-reentrant) lock.
+    http = thread_http()
+    with _lock:
+        if _service is None:
+            _service = build_from_document(
+                discovery_document(),
+                http=http,
+                requestBuilder=_build_request,
+            )
+        return _service
+
+BATCH_LIMIT = 100  # Drive API maximum calls per batch HTTP request
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+
+def list_all(service, **kwargs):
+    """files().list() across every page."""
+    kwargs.setdefault("pageSize", 1000)
+    fields = kwargs.get("fields", "files(id, name)")
+    if "nextPageToken" not in fields:
+        kwargs["fields"] = f"nextPageToken, {fields}"
+    files, page_token = [], None
+    while True:
+        results = service.files().list(pageToken=page_token, **kwargs).execute()
+        files.extend(results.get('files', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return files
+
+def _retryable(error):
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status in RETRYABLE_STATUS:
+        return True
+    if status == 403:
+        try:
+            reasons = {e.get("reason") for e in json.loads(error.content)["error"].get("errors", [])}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+        return bool(reasons & RETRYABLE_REASONS)
+    return False
+
+def execute_batch(service, requests, retries=3, backoff=2.0):
+    """Run [(key, HttpRequest)] as Drive batch calls of up to BATCH_LIMIT requests each.
+
+    Items failing with a rate-limit/5xx error are re-batched up to `retries` times with
+    exponential backoff. Returns {key: {"ok": True, "result": ...} | {"ok": False, "error": str}}.
+    """
+    results = {}
+    pending = list(requests)
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        if attempt:
+            time.sleep(backoff * (2 ** (attempt - 1)))
+        failed = []
+        by_key = dict(pending)
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                results[request_id] = {"ok": True, "result": response}
+            elif _retryable(exception) and attempt < retries:
+                failed.append((request_id, by_key[request_id]))
+            else:
+                results[request_id] = {"ok": False, "error": str(exception)}
+
+        for start in range(0, len(pending), BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=callback)
+            for key, request in pending[start:start + BATCH_LIMIT]:
+                batch.add(request, request_id=key)
+            try:
+                batch.execute(http=thread_http())
+            except Exception as e:
+                # The whole batch call failed (network, auth); retry every item in it
+                for key, request in pending[start:start + BATCH_LIMIT]:
+                    if key in results:
+                        continue
+                    if attempt < retries:
+                        failed.append((key, request))
+                    else:
+                        results[key] = {"ok": False, "error": str(e)}
+        if failed:
+            print(f"🔁 Retrying {len(failed)} failed Drive calls (attempt {attempt + 2}/{retries + 1})...")
+        pending = failed
+    return results
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+def ensure_folders(service, names, parent_id):
+    """{name: folder_id} for each name under parent_id: one list call, then one batch
+    creating whatever is missing (instead of a list + create round-trip per folder)."""
+    query = f"'{parent_id}' in parents and mimeType = '{FOLDER_MIME}' and trashed = false"
+    existing = {}
+    for folder in list_all(service, q=query, fields="files(id, name)", supportsAllDrives=True, includeItemsFromAllDrives=True):
+        existing.setdefault(folder['name'], folder['id'])
+
+    missing = [name for name in names if name not in existing]
+    requests = [
+        (name, service.files().create(body={'name': name, 'mimeType': FOLDER_MIME, 'parents': [parent_id]},
+                                      fields='id', supportsAllDrives=True))
+        for name in missing
+    ]
+    for name, result in execute_batch(service, requests).items():
+        if not result["ok"]:
+            raise RuntimeError(f"Failed to create folder '{name}': {result['error']}")
+        existing[name] = result["result"]["id"]
+        print(f"Created folder '{name}'. ID: {existing[name]}")
+    return {name: existing[name] for name in names}
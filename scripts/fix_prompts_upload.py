@@ -1,40 +1,8 @@
 import os
 import sys
-import glob
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv(".env.local")
-if not os.getenv("GOOGLE_DRIVE_FOLDER_ID"):
-    load_dotenv()
-
-PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID")
-SCOPES = ['https://www.googleapis.com/auth/drive']
-
-def authenticate():
-    creds = None
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if not os.path.exists('credentials.json'):
-                print("❌ Error: credentials.json not found.")
-                sys.exit(1)
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
-
-    return build('drive', 'v3', credentials=creds)
+from drive_client import get_service, PARENT_FOLDER_ID
+import slug_resolver
 
 def find_latest_folder(service, parent_id, slug):
     # Find the most recent folder matching the pattern
@@ -48,13 +16,13 @@ def find_latest_folder(service, parent_id, slug):
 
 def main():
     slug = 'wealth-navigator-manifesto'
-    file_path = f"content/prompts/{slug}_prompts.md"
+    file_path = slug_resolver.resolve_or_default("prompts", slug)
     
     if not os.path.exists(file_path):
         print(f"File not found: {file_path}")
         sys.exit(1)
 
-    service = authenticate()
+    service = get_service()
     
     folder_id = find_latest_folder(service, PARENT_FOLDER_ID, slug)
     if not folder_id:
@@ -0,0 +1,134 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# One launch for the whole social step: X posts for every configured brand plus social
+# posts for every newly published slug, run concurrently in one process so the Gemini
+# client, brand bibles, article index and LLM response cache are shared.
+
+import generate_x_posts
+import generate_social_posts
+import llm_cache
+import article_index
+import dedup_index
+
+BIBLES_GLOB = "libs/brain/bibles/*_bible.md"
+HISTORY_PATH = "content/published_history.json"
+SOCIAL_DIR = "content/social"
+
+def configured_brands():
+    return sorted(os.path.basename(p)[:-len("_bible.md")] for p in glob.glob(BIBLES_GLOB))
+
+def new_slugs(since=None):
+    """Published slugs without a content/social/<slug>_posts.md yet (optionally on/after since)."""
+    try:
+        with open(HISTORY_PATH, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        return []
+    slugs = []
+    for entry in history:
+        slug = entry.get("slug")
+        if not slug or (since and entry.get("date", "") < since):
+            continue
+        if not os.path.exists(os.path.join(SOCIAL_DIR, f"{slug}_posts.md")):
+            slugs.append(slug)
+    return list(dict.fromkeys(slugs))
+
+def run_job(kind, target):
+    started = time.time()
+    row = {"kind": kind, "target": target}
+    try:
+        if kind == "x_posts":
+            data = generate_x_posts.generate_x_posts(target)
+            row["output"] = os.path.join(SOCIAL_DIR, f"{target}_x_posts_latest.json")
+            row["posts"] = len(data.get("posts", []))
+        else:
+            output = generate_social_posts.generate_posts(target)
+            if not output:
+                raise RuntimeError("No posts generated")
+            row["output"] = output
+        row["ok"] = True
+    except Exception as e:
+        row["ok"] = False
+        row["error"] = str(e)
+    row["seconds"] = round(time.time() - started, 1)
+    return row
+
+def split_duplicates(slugs):
+    """Separate slugs whose article nearly duplicates an earlier one. Returns (keep, {slug: original})."""
+    keep, duplicates = [], {}
+    for slug in slugs:
+        original = dedup_index.canonical_duplicate(slug)
+        if original:
+            duplicates[slug] = original
+        else:
+            keep.append(slug)
+    return keep, duplicates
+
+def run_all(brands, slugs, workers=4, summary_path=None, skip_duplicates=True):
+    duplicates = {}
+    if skip_duplicates:
+        slugs, duplicates = split_duplicates(slugs)
+        for slug, original in duplicates.items():
+            print(f"⏭️ Skipping {slug}: near-duplicate of {original}")
+
+    jobs = [("x_posts", b) for b in brands] + [("social_posts", s) for s in slugs]
+    print(f"🚀 Generating social content: {len(brands)} brands, {len(slugs)} new slugs ({workers} workers)")
+
+    # Warm the shared front-matter index once instead of racing to build it in every worker
+    article_index.get_index()
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda job: run_job(*job), jobs))
+
+    failed = [r for r in results if not r["ok"]]
+    for r in results:
+        icon = "✅" if r["ok"] else "❌"
+        print(f"{icon} {r['kind']} {r['target']} ({r['seconds']}s) {r.get('output') or r.get('error')}")
+    print(f"📊 {len(results) - len(failed)}/{len(results)} jobs succeeded in {time.time() - started:.1f}s")
+
+    summary = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "seconds": round(time.time() - started, 1),
+        "brands": brands,
+        "slugs": slugs,
+        "skipped_duplicates": duplicates,
+        "results": results,
+        "failed": len(failed),
+        "llm_cache": dict(llm_cache.stats),
+    }
+    if summary_path:
+        os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"📝 Summary: {summary_path}")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate X posts for all brands and social posts for new slugs.")
+    parser.add_argument("--brands", nargs="*", help="Brands to generate X posts for (default: every bible)")
+    parser.add_argument("--slugs", nargs="*", help="Slugs to generate social posts for (default: new published slugs)")
+    parser.add_argument("--since", help="Only consider slugs published on/after YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent generations")
+    parser.add_argument("--summary", default=f"logs/social_run_{datetime.now():%Y-%m-%d}.json", help="Run summary JSON path")
+    parser.add_argument("--include-duplicates", action="store_true", help="Also generate for near-duplicate articles")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        llm_cache.set_mode("off")
+    brands = args.brands if args.brands is not None else configured_brands()
+    slugs = args.slugs if args.slugs is not None else new_slugs(args.since)
+
+    summary = run_all(brands, slugs, args.workers, args.summary, not args.include_duplicates)
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@ import os
 import sys
 import google.generativeai as genai
 from dotenv import load_dotenv
+import slug_resolver
+import llm_cache
+import llm_client
+import section_digest
 
 # Load environment variables
 load_dotenv(".env.local")
@@ -26,28 +30,23 @@ if not base_url:
     base_url = "https://wealth-navigator.com"
 
 def generate_posts(slug):
-    # Try exact match first
-    article_path = f"content/articles/{slug}.md"
-    
-    # If not found, try finding by suffix (e.g. date-slug.md)
-    if not os.path.exists(article_path):
-        import glob
-        matches = glob.glob(f"content/articles/*{slug}.md")
-        if matches:
-            article_path = matches[0]
-            print(f"📄 Found article: {article_path}")
-        else:
-            print(f"❌ Error: Article not found at {article_path} or via glob search.")
-            return
-
-    output_path = f"content/social/{slug}_posts.md"
-
-    # Read Article content
-    with open(article_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Exact (dated) slug first, then bare slug -> latest dated file
+    article_path = slug_resolver.resolve("articles", slug)
+    if not article_path:
+        print(f"❌ Error: Article not found for slug: {slug}")
+        return
+    print(f"📄 Found article: {article_path}")
+    # Name outputs and the link after the resolved (dated) file, so same-slug articles from
+    # different dates keep separate posts and each links to its own page
+    article_slug = os.path.basename(article_path)[:-len(".md")]
+
+    output_path = f"content/social/{article_slug}_posts.md"
+
+    # Section-by-section digest of the whole article (cached per section)
+    content = section_digest.digest_file(article_path)
 
     # Link
-    article_url = f"{base_url}/articles/{slug}"
+    article_url = f"{base_url}/articles/{article_slug}"
 
     # Prompt
     prompt = f"""
@@ -66,8 +65,7 @@ def generate_posts(slug):
     3. **【インパクト型】**: 少し強い言葉（逆説や警告）で興味を惹きつける（140文字以内）。
 
     【記事コンテンツ】
-    {content[:8000]} 
-    (以下略)
+    {content}
     
     【出力形式】
     Markdown形式で出力してください。
@@ -76,27 +74,30 @@ def generate_posts(slug):
     print(f"🤖 Generating social posts for {slug}...")
 
     # Generation
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    response = model.generate_content(prompt)
+    text = llm_cache.cached_call('gemini-2.0-flash', prompt, lambda: llm_client.call_gemini(prompt, 'gemini-2.0-flash'))
     
-    if response.text:
+    if text:
         # Ensure directory exists
         os.makedirs("content/social", exist_ok=True)
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(f"# Social Media Posts for: {slug}\n\n")
+            f.write(f"# Social Media Posts for: {article_slug}\n\n")
             f.write(f"Generated at: {os.getenv('CurrentTime', '')}\n")
             f.write(f"Article URL: {article_url}\n\n")
             f.write("---\n\n")
-            f.write(response.text)
+            f.write(text)
         
         print(f"✅ Generated social posts: {output_path}")
+        return output_path
     else:
         print("❌ Failed to generate content.")
 
 def main():
+    if "--no-cache" in sys.argv:
+        sys.argv.remove("--no-cache")
+        llm_cache.set_mode("off")
     if len(sys.argv) < 2:
-        print("Usage: python3 generate_social_posts.py <slug>")
+        print("Usage: python3 generate_social_posts.py <slug> [--no-cache]")
         sys.exit(1)
     
     slug = sys.argv[1]
@@ -1,9 +1,14 @@
 import os
 import sys
 import json
-import glob
 import google.generativeai as genai
 from dotenv import load_dotenv
+import article_index
+import slug_resolver
+import llm_cache
+import llm_client
+import brand_context
+import section_digest
 
 # Load environment variables
 load_dotenv(".env.local")
@@ -12,49 +17,32 @@ load_dotenv(".env.local")
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 def get_latest_article(brand):
-    """Find the latest article for a specific brand."""
-    files = glob.glob(f"content/articles/*.md")
-    brand_files = []
-    for f in files:
-        with open(f, 'r', encoding='utf-8') as file:
-            content = file.read()
-            # Simple site_id check in frontmatter
-            if f'site_id: "{brand}"' in content or f'site_id: {brand}' in content or f'site_id: "{brand}"' in content:
-                brand_files.append(f)
-    
-    if not brand_files:
-        return None
-    
-    # Sort by filename (which starts with YYYY-MM-DD usually) or mtime
-    brand_files.sort(key=os.path.getmtime, reverse=True)
-    return brand_files[0]
+    """Find the latest article for a specific brand (via the front-matter index)."""
+    entry = article_index.get_index().latest(brand)
+    return entry["path"] if entry else None
+
+def strip_fences(text):
+    return text.replace('```json', '').replace('```', '').strip()
 
 def generate_x_posts(brand, slug=None):
     # 1. Load Bible
-    bible_path = f"libs/brain/bibles/{brand}_bible.md"
-    if not os.path.exists(bible_path):
-        # Fallback to general titan knowledge if specific bible missing
-        bible_path = "libs/brain/titans_knowledge.md"
-    
-    with open(bible_path, 'r', encoding='utf-8') as f:
-        bible_content = f.read()
+    # Falls back to general titan knowledge if the specific bible is missing
+    bible_content = brand_context.load_bible(brand)
+    bible_digest = section_digest.build_digest(bible_content)
 
     # 2. Get Article
     if not slug:
         article_file = get_latest_article(brand)
     else:
-        article_file = f"content/articles/{slug}.md"
-        if not os.path.exists(article_file):
-            matches = glob.glob(f"content/articles/*{slug}*.md")
-            article_file = matches[0] if matches else None
+        article_file = slug_resolver.resolve("articles", slug)
 
     if not article_file:
         print(f"⚠️ Warning: No article found for {brand}. Generating only Mindset posts.")
-        article_content = "N/A"
+        article_digest = "N/A"
         article_url = "#"
     else:
-        with open(article_file, 'r', encoding='utf-8') as f:
-            article_content = f.read()
+        # Section digest covers the whole article instead of its first 5000 characters
+        article_digest = section_digest.digest_file(article_file)
         slug_actual = os.path.basename(article_file).replace(".md", "")
         # Construct URL based on brand
         base_url = os.getenv("NEXT_PUBLIC_BASE_URL", "https://wealth-navigator.com")
@@ -67,11 +55,11 @@ def generate_x_posts(brand, slug=None):
 
     ---
     ### 【ブランドバイブル】
-    {bible_content[:5000]}
+    {bible_digest}
 
     ---
     ### 【最新記事】
-    {article_content[:5000]}
+    {article_digest}
     記事URL: {article_url}
 
     ---
@@ -101,12 +89,14 @@ def generate_x_posts(brand, slug=None):
 
     # 4. Generation
     print(f"🤖 Generating 5 X posts for {brand}...")
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    
     try:
-        response = model.generate_content(prompt)
-        text = response.text.replace('```json', '').replace('```', '').strip()
-        data = json.loads(text)
+        # Only well-formed JSON is cached, so a bad answer is regenerated on the next run
+        raw = llm_cache.cached_call(
+            'gemini-2.0-flash', prompt,
+            lambda: llm_client.call_gemini(prompt, 'gemini-2.0-flash'),
+            validate=lambda t: json.loads(strip_fences(t)),
+        )
+        data = json.loads(strip_fences(raw))
         
         # Save locally
         save_dir = "content/social"
@@ -127,6 +117,9 @@ def generate_x_posts(brand, slug=None):
         raise e
 
 if __name__ == "__main__":
+    if "--no-cache" in sys.argv:
+        sys.argv.remove("--no-cache")
+        llm_cache.set_mode("off")
     b = sys.argv[1] if len(sys.argv) > 1 else "wealth"
     s = sys.argv[2] if len(sys.argv) > 2 else None
     generate_x_posts(b, s)
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+# On-disk prompt/response cache for the LLM-calling scripts.
+#
+# Key: sha256(model, full prompt, generation params). One JSON file per entry under
+# <dir>/<key[:2]>/<key>.json; the file mtime is the LRU clock (touched on every hit).
+#
+# LLM_CACHE_MODE:
+#   on       read + write the cache, entries expire after LLM_CACHE_TTL_HOURS (default)
+#   refresh  always call the provider, overwrite the cached entry
+#   off      bypass completely (same as LLM_CACHE_BYPASS=1 or a script's --no-cache)
+#   record   call the provider and store the response as a non-expiring fixture
+#   replay   serve fixtures only, never touch the network (offline tests/benchmarks)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(REPO_ROOT, ".cache", "llm"))
+FIXTURE_DIR = os.getenv("LLM_FIXTURE_DIR", os.path.join(REPO_ROOT, ".cache", "llm_fixtures"))
+TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_HOURS", "72")) * 3600
+MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+MODES = ("on", "refresh", "off", "record", "replay")
+
+class LLMCacheMiss(Exception):
+    """Raised in replay mode when no fixture exists for a request."""
+
+_mode = "off" if os.getenv("LLM_CACHE_BYPASS") in ("1", "true") else os.getenv("LLM_CACHE_MODE", "on").lower()
+stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()  # lookups run from the generation thread pools
+_evict_lock = threading.Lock()
+_evicted = False
+
+def set_mode(mode):
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unknown LLM cache mode: {mode}")
+    _mode = mode
+
+def get_mode():
+    return _mode
+
+def make_key(model, prompt, params=None):
+    payload = json.dumps({"model": model, "prompt": prompt, "params": params or {}}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _entry_path(directory, key):
+    return os.path.join(directory, key[:2], f"{key}.json")
+
+def _read(directory, key, ttl):
+    path = _entry_path(directory, key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if ttl and time.time() - entry.get("created_at", 0) > ttl:
+        return None
+    try:
+        os.utime(path)  # LRU touch
+    except OSError:
+        pass
+    return entry["response"]
+
+def _write(directory, key, model, params, response):
+    path = _entry_path(directory, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"model": model, "params": params or {}, "created_at": time.time(), "response": response}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def evict(directory=CACHE_DIR, max_bytes=MAX_BYTES, ttl=TTL_SECONDS):
+    """Drop expired entries, then least-recently-used ones until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    now = time.time()
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if ttl and now - st.st_mtime > ttl:
+                # Not even read within the TTL, so the entry itself is expired too
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+def _evict_once():
+    """Evict on the first write of the process only; concurrent callers never walk the tree twice."""
+    global _evicted
+    with _evict_lock:
+        if _evicted:
+            return
+        _evicted = True
+    evict()
+
+def _count(name):
+    with _stats_lock:
+        stats[name] += 1
+
+def lookup(model, prompt, params=None):
+    """Cached response or None. In replay mode a miss raises LLMCacheMiss."""
+    key = make_key(model, prompt, params)
+    if _mode == "replay":
+        response = _read(FIXTURE_DIR, key, ttl=None)
+        if response is None:
+            _count("misses")
+            raise LLMCacheMiss(f"No recorded response for {model} (key {key[:12]})")
+    elif _mode == "on":
+        response = _read(CACHE_DIR, key, TTL_SECONDS)
+    else:
+        response = None
+    _count("hits" if response is not None else "misses")
+    return response
+
+def store(model, prompt, response, params=None):
+    if _mode in ("off", "replay") or not response:
+        return
+    key = make_key(model, prompt, params)
+    if _mode == "record":
+        _write(FIXTURE_DIR, key, model, params, response)
+    else:
+        _write(CACHE_DIR, key, model, params, response)
+        _evict_once()
+
+def cached_call(model, prompt, call, params=None, validate=None):
+    """Return call()'s text for (model, prompt, params), served from the cache when possible.
+
+    validate(text) may raise to keep a malformed response out of the cache.
+    """
+    response = lookup(model, prompt, params)
+    if response is not None:
+        return response
+
+    response = call()
+    if response and validate and _mode not in ("off", "replay"):
+        validate(response)
+    store(model, prompt, response, params)
+    return response
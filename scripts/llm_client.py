@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import threading
+import functools
+import queue
+
+# Shared LLM client layer.
+#
+# - One keep-alive requests.Session (pooled HTTPAdapter) for all Anthropic calls, instead of a
+#   fresh TLS connection per requests.post().
+# - Every call has a connect/read timeout; Gemini gets the same budget via request_options.
+# - hedged(): start the primary provider, and if it has not answered within a latency budget
+#   also start the secondary; the first successful answer wins.
+
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_VERSION = "2023-06-01"
+
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "180"))
+HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0"))  # seconds, 0 = no hedging
+POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Process-wide pooled session (requests.Session is safe to share for simple POSTs)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            # Retry only connection setup and overload statuses; the body is re-sent as-is
+            retry = Retry(total=2, connect=2, read=0, backoff_factor=1.0,
+                          status_forcelist=(429, 529), allowed_methods=None, respect_retry_after_header=True)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+def _claude_request(prompt, model_id, system, max_tokens):
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise Exception("ANTHROPIC_API_KEY not found.")
+
+    headers = {
+        "x-api-key": api_key,
+        "anthropic-version": ANTHROPIC_VERSION,
+        "content-type": "application/json"
+    }
+    data = {
+        "model": model_id,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    if system:
+        data["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+    return headers, data
+
+def call_claude(prompt, model_id, system=None, max_tokens=4096, timeout=None):
+    """Anthropic Messages API. system: stable prefix sent as a cache_control block."""
+    headers, data = _claude_request(prompt, model_id, system, max_tokens)
+    response = get_session().post(ANTHROPIC_URL, headers=headers, json=data,
+                                  timeout=(CONNECT_TIMEOUT, timeout or READ_TIMEOUT))
+    if response.status_code != 200:
+        raise Exception(f"Claude API error: {response.text}")
+    return response.json()["content"][0]["text"]
+
+def stream_claude(prompt, model_id, system=None, max_tokens=4096, timeout=None):
+    """Yield text deltas from the Messages SSE stream. timeout bounds each read, not the total."""
+    headers, data = _claude_request(prompt, model_id, system, max_tokens)
+    data["stream"] = True
+    with get_session().post(ANTHROPIC_URL, headers=headers, json=data, stream=True,
+                            timeout=(CONNECT_TIMEOUT, timeout or READ_TIMEOUT)) as response:
+        if response.status_code != 200:
+            raise Exception(f"Claude API error: {response.text}")
+        response.encoding = "utf-8"  # text/event-stream would otherwise decode as latin-1
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:])
+            if event.get("type") == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                yield event["delta"]["text"]
+            elif event.get("type") == "error":
+                raise Exception(f"Claude API error: {event.get('error')}")
+            elif event.get("type") == "message_stop":
+                return
+
+@functools.lru_cache(maxsize=None)
+def gemini_model(model_name="gemini-2.0-flash"):
+    import google.generativeai as genai
+    return genai.GenerativeModel(model_name)
+
+def call_gemini(prompt, model_name="gemini-2.0-flash", timeout=None):
+    """Gemini generate_content with a hard per-request timeout. Assumes genai.configure() ran."""
+    response = gemini_model(model_name).generate_content(
+        prompt, request_options={"timeout": timeout or READ_TIMEOUT}
+    )
+    return response.text
+
+def stream_gemini(prompt, model_name="gemini-2.0-flash", timeout=None):
+    """Yield text chunks from generate_content(stream=True)."""
+    response = gemini_model(model_name).generate_content(
+        prompt, stream=True, request_options={"timeout": timeout or READ_TIMEOUT}
+    )
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. the final safety/finish metadata)
+            continue
+        if text:
+            yield text
+
+def _start_leg(name, fn, results):
+    # Daemon thread: a losing call stuck in a slow read must not hold the interpreter open
+    # at exit (a ThreadPoolExecutor would join it for up to READ_TIMEOUT).
+    def run():
+        try:
+            results.put((name, fn(), None))
+        except Exception as e:
+            results.put((name, None, e))
+    threading.Thread(target=run, name=f"llm-hedge-{name}", daemon=True).start()
+
+def hedged(primary, secondary, budget=None, log=print):
+    """Run primary=(name, fn); after `budget` seconds without an answer also run secondary.
+
+    Returns (text, name) from the first call that succeeds. If the primary fails before the
+    budget expires the secondary starts immediately. Raises the last error if both fail.
+    The losing call runs on a daemon thread; its result is dropped and it never delays exit.
+    """
+    budget = HEDGE_BUDGET if budget is None else budget
+    started = time.monotonic()
+    results = queue.Queue()
+    _start_leg(primary[0], primary[1], results)
+    running = 1
+    secondary_started = False
+    last_error = None
+
+    while running:
+        timeout = None
+        if not secondary_started:
+            timeout = max(0.0, budget - (time.monotonic() - started))
+        try:
+            name, text, error = results.get(timeout=timeout)
+        except queue.Empty:
+            name = None
+        else:
+            running -= 1
+            if error is None and text:
+                return text, name
+            last_error = error or RuntimeError(f"Empty response from {name}")
+            log(f"⚠️ {name} failed: {last_error}")
+
+        if not secondary_started and (not running or name is None):
+            if running:
+                log(f"⏱️ {primary[0]} slower than {budget:g}s, hedging with {secondary[0]}...")
+            _start_leg(secondary[0], secondary[1], results)
+            running += 1
+            secondary_started = True
+
+    raise last_error
@@ -1,6 +1,58 @@
+import os
 import sys
+import glob
+import json
+import argparse
 from mutagen.mp3 import MP3
 
+# Header metadata cache: abspath -> {size, mtime_ns, duration, bitrate, sample_rate}
+CACHE_PATH = os.getenv("AUDIO_META_CACHE", os.path.join(os.path.dirname(__file__), "..", ".cache", "audio_meta.json"))
+
+def load_cache():
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    tmp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, CACHE_PATH)
+
+def expand_paths(args):
+    """Accept files, directories (all *.mp3 inside) and glob patterns."""
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            paths.extend(sorted(glob.glob(os.path.join(arg, "*.mp3"))))
+        elif any(ch in arg for ch in "*?["):
+            paths.extend(sorted(glob.glob(arg, recursive=True)))
+        else:
+            paths.append(arg)
+    return paths
+
+def probe(path, cache):
+    """Return header metadata for path, re-parsing only if size or mtime changed."""
+    key = os.path.abspath(path)
+    st = os.stat(path)
+    entry = cache.get(key)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return dict(entry, cached=True)
+
+    info = MP3(path).info
+    entry = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "duration": info.length,
+        "bitrate": info.bitrate,
+        "sample_rate": info.sample_rate,
+    }
+    cache[key] = entry
+    return dict(entry, cached=False)
+
 def get_duration(file_path):
     try:
         audio = MP3(file_path)
@@ -9,9 +61,43 @@ def get_duration(file_path):
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+def measure_many(paths):
+    cache = load_cache()
+    results = []
+    errors = 0
+    for path in paths:
+        try:
+            entry = probe(path, cache)
+            results.append({
+                "path": path,
+                "duration": entry["duration"],
+                "bitrate": entry["bitrate"],
+                "sample_rate": entry["sample_rate"],
+                "cached": entry["cached"],
+            })
+        except Exception as e:
+            errors += 1
+            results.append({"path": path, "error": str(e)})
+    save_cache(cache)
+
+    print(json.dumps({
+        "files": results,
+        "total_duration": sum(r.get("duration", 0) for r in results),
+        "errors": errors,
+    }, ensure_ascii=False))
+    return errors == 0
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python measure_audio.py <mp3_path>", file=sys.stderr)
-        sys.exit(1)
-    
-    get_duration(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Measure MP3 durations.")
+    parser.add_argument("paths", nargs="+", help="MP3 files, directories or glob patterns")
+    parser.add_argument("--json", action="store_true", help="JSON output (implied for several paths, dirs or globs)")
+    args = parser.parse_args()
+
+    arg = args.paths[0]
+    single = len(args.paths) == 1 and not args.json and not os.path.isdir(arg) and not any(ch in arg for ch in "*?[")
+    if single:
+        # Legacy contract: bare float on stdout
+        get_duration(args.paths[0])
+    else:
+        ok = measure_many(expand_paths(args.paths))
+        sys.exit(0 if ok else 1)
@@ -1,8 +1,19 @@
 import os
 import sys
+import glob
+import json
+import time
+import re
 import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from dotenv import load_dotenv
+from article_index import read_front_matter
+import llm_cache
+import llm_client
+from brand_context import get_brand_context
 
 # Load environment variables
 load_dotenv(".env.local")
@@ -19,172 +30,371 @@ if not api_key:
 
 genai.configure(api_key=api_key)
 
-def load_brand_context(site_id):
-    bible_path = f"libs/brain/bibles/{site_id}_bible.md"
-    editor_path = "libs/brain/article_editor.md"
-    
-    bible_content = ""
-    if os.path.exists(bible_path):
-        with open(bible_path, 'r', encoding='utf-8') as f:
-            bible_content = f.read()
-    else:
-        print(f"⚠️ Warning: Bible for {site_id} not found at {bible_path}")
-
-    editor_content = ""
-    if os.path.exists(editor_path):
-        with open(editor_path, 'r', encoding='utf-8') as f:
-            editor_content = f.read()
-            
-    return bible_content, editor_content
-
 def detect_site_id(file_path):
-    # Try to find site_id in frontmatter
+    # Try to find site_id in frontmatter (header only, shared parser with the article index)
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if content.startswith('---'):
-                end = content.find('---', 3)
-                if end != -1:
-                    frontmatter = content[3:end]
-                    for line in frontmatter.split('\n'):
-                        if 'site_id:' in line:
-                            return line.split('site_id:')[1].strip().strip('"').strip("'")
-    except:
+        site_id = read_front_matter(file_path).get("site_id")
+        if site_id:
+            return site_id
+    except (OSError, UnicodeDecodeError):
         pass
     return "wealth" # Default
 
-def call_claude(prompt, model_id="claude-3-5-sonnet-20241022"):
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise Exception("ANTHROPIC_API_KEY not found.")
-    
-    url = "https://api.anthropic.com/v1/messages"
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
-    data = {
-        "model": model_id,
-        "max_tokens": 4096,
-        "messages": [{"role": "user", "content": prompt}]
-    }
+def call_claude(prompt, model_id="claude-3-5-sonnet-20241022", system=None):
+    """system: stable prefix sent as a cache_control block so repeat calls hit the prompt cache."""
+    return llm_client.call_claude(prompt, model_id, system=system)
+
+class RateLimiter:
+    """Spaces calls to one provider to at most rpm requests per minute (thread-safe)."""
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm and rpm > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+# Per-provider limiters; replaced by polish_batch() from the CLI flags
+RATE_LIMITERS = {"gemini": RateLimiter(0), "claude": RateLimiter(0)}
+
+def build_prompt(raw_content, site_id):
+    """Returns (prefix, body): the brand-stable prefix and the per-article tail."""
+    ctx = get_brand_context(site_id)
+    return ctx.polish_prefix, ctx.polish_body(raw_content)
+
+def cached_claude(prefix, body, model_id):
+    def claude():
+        RATE_LIMITERS["claude"].wait()
+        return call_claude(body, model_id, system=prefix)
+    return llm_cache.cached_call(model_id, prefix + body, claude, params={"max_tokens": 4096})
+
+def cached_gemini(prompt):
+    def gemini():
+        RATE_LIMITERS["gemini"].wait()
+        return llm_client.call_gemini(prompt, "gemini-2.0-flash")
+    return llm_cache.cached_call("gemini-2.0-flash", prompt, gemini)
+
+def generate_polished(prefix, body, log=print, hedge=None):
+    """Model Fallback: Gemini -> Sonnet -> Haiku. Returns (text, provider); raises if all fail.
+
+    hedge: latency budget in seconds; when set, Sonnet is started alongside a Gemini call
+    that has not answered within the budget and the first answer wins.
+    """
+    prompt = prefix + body
+    hedge = llm_client.HEDGE_BUDGET if hedge is None else hedge
+    if hedge > 0:
+        log(f"🧠 Attempting Gemini (2.0 Flash), hedging with Sonnet after {hedge:g}s...")
+        try:
+            return llm_client.hedged(
+                ("gemini-2.0-flash", lambda: cached_gemini(prompt)),
+                ("claude-3-5-sonnet-20241022", lambda: cached_claude(prefix, body, "claude-3-5-sonnet-20241022")),
+                budget=hedge, log=log,
+            )
+        except Exception as e:
+            log(f"⚠️ Gemini and Sonnet failed: {e}. Trying Haiku...")
+        return cached_claude(prefix, body, "claude-3-haiku-20240307"), "claude-3-haiku-20240307"
+
+    try:
+        log("🧠 Attempting Gemini (2.0 Flash)...")
+        return cached_gemini(prompt), "gemini-2.0-flash"
+    except Exception as e:
+        log(f"⚠️ Gemini failed: {e}. Trying Claude...")
+    try:
+        return cached_claude(prefix, body, "claude-3-5-sonnet-20241022"), "claude-3-5-sonnet-20241022"
+    except Exception as e2:
+        log(f"⚠️ Sonnet failed: {e2}. Trying Haiku...")
+    return cached_claude(prefix, body, "claude-3-haiku-20240307"), "claude-3-haiku-20240307"
+
+def clean_output(polished_text, raw_content):
+    # Robust cleaning
+    clean_text = polished_text.strip()
     
-    import requests
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code != 200:
-        raise Exception(f"Claude API error: {response.text}")
+    # Remove common AI preambles
+    if "Here is" in clean_text[:100] and "\n" in clean_text:
+        clean_text = "\n".join(clean_text.split("\n")[1:]).strip()
+        
+    # Remove markdown code blocks
+    clean_text = clean_text.replace("```html", "").replace("```", "").strip()
     
-    return response.json()["content"][0]["text"]
+    # Ensure we don't double include frontmatter if AI added it
+    if clean_text.startswith('---') and raw_content.startswith('---'):
+        # Already has frontmatter, keep as is
+        pass
+    elif not clean_text.startswith('---') and raw_content.startswith('---'):
+        # Prepend original frontmatter
+        end = raw_content.find('---', 3)
+        if end != -1:
+            frontmatter = raw_content[:end+3]
+            clean_text = frontmatter + "\n\n" + clean_text
+    return clean_text
 
-def polish_content(input_file, site_id=None):
-    if not os.path.exists(input_file):
-        print(f"❌ Error: File {input_file} not found.")
-        sys.exit(1)
+class OffFormatError(Exception):
+    """The model output does not look like the requested HTML article."""
+
+HTML_TAG = re.compile(r'<(h[1-6]|p|div|ul|ol|li|table|strong|section)\b', re.IGNORECASE)
+FENCE = "```html"
+PREAMBLE_CHARS = 100
+FORMAT_CHECK_CHARS = int(os.getenv("POLISH_FORMAT_CHECK_CHARS", "3000"))
+
+class StreamCleaner:
+    """Incremental clean_output(): strips the preamble line and code fences as chunks arrive
+    and writes the result to out. Raises OffFormatError once FORMAT_CHECK_CHARS of output
+    contain no HTML tag, so a runaway off-format generation can be cancelled early."""
+    def __init__(self, out, raw_content):
+        self.out = out
+        self.raw_content = raw_content
+        self.head = ""        # buffered until the preamble decision can be made
+        self.head_done = False
+        self.pending = ""     # possible partial fence / trailing whitespace held back
+        self.started = False  # first non-whitespace character written
+        self.probe = ""
+        self.written = 0
+
+    def feed(self, chunk):
+        if not self.head_done:
+            self.head += chunk
+            stripped = self.head.lstrip()
+            if len(stripped) < PREAMBLE_CHARS:
+                return
+            if "Here is" in stripped[:PREAMBLE_CHARS] and "\n" not in stripped:
+                # The whole preamble line has to arrive before it can be dropped
+                if len(stripped) >= FORMAT_CHECK_CHARS:
+                    raise OffFormatError(f"No line break in the first {FORMAT_CHECK_CHARS} characters")
+                return
+            chunk = self._strip_preamble(stripped)
+        self._emit(chunk)
+
+    def _strip_preamble(self, text):
+        self.head_done = True
+        self.head = ""
+        # Remove common AI preambles
+        if "Here is" in text[:PREAMBLE_CHARS] and "\n" in text:
+            text = text.split("\n", 1)[1]
+        return text
+
+    def _emit(self, text, final=False):
+        buf = self.pending + text
+        hold = 0
+        if not final:
+            # Hold back a suffix that may be the start of a fence split across chunks
+            for n in range(len(FENCE) - 1, 0, -1):
+                if buf.endswith(FENCE[:n]):
+                    hold = n
+                    break
+        body, self.pending = buf[:len(buf) - hold], buf[len(buf) - hold:]
+        # Remove markdown code blocks
+        body = body.replace(FENCE, "").replace("```", "")
+
+        if not final:
+            # Trailing whitespace is only written once more text follows (final strip())
+            trimmed = body.rstrip()
+            self.pending = body[len(trimmed):] + self.pending
+            body = trimmed
+        else:
+            body = body.rstrip()
+
+        if not self.started:
+            body = body.lstrip()
+            if not body:
+                return
+            if len(body) < 3 and not final:
+                self.pending = body + self.pending
+                return
+            self.started = True
+            # Prepend original frontmatter unless the model kept it
+            if not body.startswith('---') and self.raw_content.startswith('---'):
+                end = self.raw_content.find('---', 3)
+                if end != -1:
+                    body = self.raw_content[:end+3] + "\n\n" + body
+        self._write(body)
 
+    def _write(self, text):
+        self.out.write(text)
+        self.written += len(text)
+        if len(self.probe) < FORMAT_CHECK_CHARS:
+            self.probe += text
+            if len(self.probe) >= FORMAT_CHECK_CHARS and not HTML_TAG.search(self.probe):
+                raise OffFormatError(f"No HTML in the first {FORMAT_CHECK_CHARS} characters")
+
+    def close(self):
+        if not self.head_done:
+            text = self._strip_preamble(self.head.lstrip())
+        else:
+            text = ""
+        self._emit(text, final=True)
+        if not self.started:
+            raise RuntimeError("Empty response from model")
+
+def write_atomic(path, text):
+    """Replace path in one step so readers never see a half-written article."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".polish_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def stream_to_file(path, raw_content, chunks):
+    """Clean chunks into a temp file next to path and swap it in once the stream completes.
+    Returns the raw (uncleaned) model text for the response cache."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".polish_", suffix=".tmp")
+    raw_parts = []
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            cleaner = StreamCleaner(f, raw_content)
+            for chunk in chunks:
+                raw_parts.append(chunk)
+                cleaner.feed(chunk)
+            cleaner.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        # Closing the generator drops the HTTP stream when we abort early
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return "".join(raw_parts)
+
+def stream_polished(path, raw_content, prefix, body, log=print):
+    """Streaming variant of generate_polished() that writes path directly. Returns the provider."""
+    prompt = prefix + body
+    providers = [
+        ("gemini-2.0-flash", "gemini", lambda: llm_client.stream_gemini(prompt, "gemini-2.0-flash"), None),
+        ("claude-3-5-sonnet-20241022", "claude",
+         lambda: llm_client.stream_claude(body, "claude-3-5-sonnet-20241022", system=prefix), {"max_tokens": 4096}),
+        ("claude-3-haiku-20240307", "claude",
+         lambda: llm_client.stream_claude(body, "claude-3-haiku-20240307", system=prefix), {"max_tokens": 4096}),
+    ]
+    last_error = None
+    for model_id, limiter, open_stream, params in providers:
+        try:
+            cached = llm_cache.lookup(model_id, prompt, params)
+            if cached is not None:
+                log(f"💾 Using cached {model_id} response")
+                stream_to_file(path, raw_content, iter([cached]))
+                return model_id
+            log(f"🧠 Streaming from {model_id}...")
+            RATE_LIMITERS[limiter].wait()
+            text = stream_to_file(path, raw_content, open_stream())
+            llm_cache.store(model_id, prompt, text, params)
+            return model_id
+        except Exception as e:
+            last_error = e
+            log(f"⚠️ {model_id} failed: {e}")
+    raise last_error
+
+def polish_file(input_file, site_id=None, log=print, hedge=None, stream=False):
+    """Polish one article in place. Returns the provider used; raises on failure."""
     if not site_id:
         site_id = detect_site_id(input_file)
     
-    print(f"🤖 Polishing article for brand: [{site_id}]")
+    log(f"🤖 Polishing article for brand: [{site_id}]")
 
     with open(input_file, 'r', encoding='utf-8') as f:
         raw_content = f.read()
 
-    brand_bible, editor_guide = load_brand_context(site_id)
+    if stream:
+        return stream_polished(input_file, raw_content, *build_prompt(raw_content, site_id), log=log)
 
-    # Extract Expert Box Label from bible if exists
-    expert_label = "【30年のプロの眼】"
-    for line in brand_bible.split('\n'):
-        if "Expert Boxラベル" in line or "Expert Box Label" in line:
-            label = line.split(':')[-1].strip().strip('*')
-            if label:
-                expert_label = label
-                break
+    polished_text, provider = generate_polished(*build_prompt(raw_content, site_id), log=log, hedge=hedge)
+    if not polished_text:
+        raise RuntimeError("Empty response from model")
 
-    # Prompt for formatting
-    prompt = f"""
-    You are an expert editor specializing in the following brand:
-    
-    --- BRAND BIBLE ---
-    {brand_bible}
-    
-    --- WRITING STYLE GUIDE ---
-    {editor_guide}
-    
-    --- TASK ---
-    Take the provided RAW CONTENT and restructure it into high-quality HTML format exactly as defined in the WRITING STYLE GUIDE.
-    
-    【Rules】
-    1. **Strict Tone**: Use the persona and tone defined in the BRAND BIBLE.
-    2. **HTML Only**: Use standard HTML tags (h2, h3, p, ul, li, strong, table). 
-    3. **Expert Box**: Extract the most critical insight/verdict and wrap it in: <div class="expert-box">{expert_label}...</div>
-    4. **Image Placeholders**: Check the markers [IMAGE_1], [IMAGE_2], [IMAGE_3] in the content. Replace them with:
-       - <div class="image-wrapper"><img src="IMAGE_ID_1" alt="[Scene Description]"></div> (after Lead)
-       - <div class="image-wrapper"><img src="IMAGE_ID_2" alt="[Scene Description]"></div> (middle)
-       - <div class="image-wrapper"><img src="IMAGE_ID_3" alt="[Scene Description]"></div> (before Conclusion)
-    5. **Frontmatter**: Preserve the original YAML frontmatter if present.
-    
-    【RAW CONTENT】
-    {raw_content}
-    
-    【OUTPUT】
-    Output ONLY the polished content. 
-    """
+    write_atomic(input_file, clean_output(polished_text, raw_content))
+    return provider
+
+def polish_content(input_file, site_id=None, hedge=None, stream=False):
+    if not os.path.exists(input_file):
+        print(f"❌ Error: File {input_file} not found.")
+        sys.exit(1)
 
-    # Model Fallback: Gemini -> Claude
     try:
-        print("🧠 Attempting Gemini (2.0 Flash)...")
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-        polished_text = response.text
+        polish_file(input_file, site_id, hedge=hedge, stream=stream)
     except Exception as e:
-        print(f"⚠️ Gemini failed: {e}. Trying Claude...")
+        print(f"❌ All models failed: {e}")
+        sys.exit(1)
+
+    print(f"✅ Content polished and saved to: {input_file}")
+
+def polish_batch(paths, site_id=None, workers=4, gemini_rpm=15, claude_rpm=50, report_path=None, hedge=None, stream=False):
+    """Polish many articles concurrently; each file is written as soon as it completes."""
+    RATE_LIMITERS["gemini"] = RateLimiter(gemini_rpm)
+    RATE_LIMITERS["claude"] = RateLimiter(claude_rpm)
+    print(f"🚀 Polishing {len(paths)} articles ({workers} workers, Gemini {gemini_rpm} rpm, Claude {claude_rpm} rpm)")
+
+    def job(path):
+        name = os.path.basename(path)
+        started = time.time()
         try:
-            polished_text = call_claude(prompt, "claude-3-5-sonnet-20241022")
-        except Exception as e2:
-            print(f"⚠️ Sonnet failed: {e2}. Trying Haiku...")
-            try:
-                polished_text = call_claude(prompt, "claude-3-haiku-20240307")
-            except Exception as e3:
-                print(f"❌ All models failed: {e3}")
-                sys.exit(1)
-
-    if polished_text:
-        # Robust cleaning
-        clean_text = polished_text.strip()
-        
-        # Remove common AI preambles
-        if "Here is" in clean_text[:100] and "\n" in clean_text:
-            clean_text = "\n".join(clean_text.split("\n")[1:]).strip()
-            
-        # Remove markdown code blocks
-        clean_text = clean_text.replace("```html", "").replace("```", "").strip()
-        
-        # Ensure we don't double include frontmatter if AI added it
-        if clean_text.startswith('---') and raw_content.startswith('---'):
-            # Already has frontmatter, keep as is
-            pass
-        elif not clean_text.startswith('---') and raw_content.startswith('---'):
-            # Prepend original frontmatter
-            end = raw_content.find('---', 3)
-            if end != -1:
-                frontmatter = raw_content[:end+3]
-                clean_text = frontmatter + "\n\n" + clean_text
-
-        with open(input_file, 'w', encoding='utf-8') as f:
-            f.write(clean_text)
-        
-        print(f"✅ Content polished and saved to: {input_file}")
-    else:
-        print("❌ Failed to polish content.")
+            provider = polish_file(path, site_id, log=lambda msg: print(f"[{name}] {msg}"), hedge=hedge, stream=stream)
+            row = {"path": path, "ok": True, "provider": provider}
+        except Exception as e:
+            row = {"path": path, "ok": False, "error": str(e)}
+        row["seconds"] = round(time.time() - started, 1)
+        icon = "✅" if row["ok"] else "❌"
+        print(f"{icon} [{name}] {row['seconds']}s via {row.get('provider', row.get('error'))}")
+        return row
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(job, paths))
+
+    failed = [r for r in results if not r["ok"]]
+    print(f"📊 {len(results) - len(failed)}/{len(results)} polished in {time.time() - started:.1f}s")
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({"results": results, "failed": len(failed)}, f, ensure_ascii=False, indent=2)
+    return not failed
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        if any(ch in pattern for ch in "*?["):
+            paths.extend(sorted(glob.glob(pattern)))
+        elif os.path.exists(pattern):
+            paths.append(pattern)
+        else:
+            print(f"⚠️ Skipping missing file: {pattern}")
+    return list(dict.fromkeys(paths))
 
 def main():
     parser = argparse.ArgumentParser(description="Polish article content using AI.")
-    parser.add_argument("file_path", help="Path to the article file")
+    parser.add_argument("file_paths", nargs="+", help="Article file(s) or glob pattern(s); several files run as a batch")
     parser.add_argument("--site_id", help="Brand ID (wealth, subsidy, etc.)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent articles in batch mode")
+    parser.add_argument("--gemini-rpm", type=int, default=15, help="Gemini requests per minute in batch mode")
+    parser.add_argument("--claude-rpm", type=int, default=50, help="Claude requests per minute in batch mode")
+    parser.add_argument("--report", help="Write per-file latency/provider report as JSON")
+    parser.add_argument("--hedge", type=float, default=None, help="Start Sonnet if Gemini has not answered within this many seconds (env LLM_HEDGE_BUDGET)")
+    parser.add_argument("--stream", action="store_true", help="Stream the model output into the file (serial fallback, no hedging)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
     
     args = parser.parse_args()
-    polish_content(args.file_path, args.site_id)
+    if args.no_cache:
+        llm_cache.set_mode("off")
+    is_batch = len(args.file_paths) > 1 or any(ch in p for p in args.file_paths for ch in "*?[")
+    if not is_batch:
+        polish_content(args.file_paths[0], args.site_id, args.hedge, args.stream)
+        return
+
+    paths = expand_paths(args.file_paths)
+    if not paths:
+        print("❌ No articles matched.")
+        sys.exit(1)
+    ok = polish_batch(paths, args.site_id, args.workers, args.gemini_rpm, args.claude_rpm, args.report, args.hedge, args.stream)
+    sys.exit(0 if ok else 1)
 
 if __name__ == "__main__":
     main()
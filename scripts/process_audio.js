@@ -1,11 +1,9 @@
 const fs = require('fs');
 const path = require('path');
-const { exec } = require('child_process');
-const mp3Duration = require('mp3-duration');
+const { execFile } = require('child_process');
 const util = require('util');
 
-const execPromise = util.promisify(exec);
-const getDuration = util.promisify(mp3Duration);
+const execFilePromise = util.promisify(execFile);
 
 // Paths
 const VIDEO_GEN_DIR = path.join(__dirname, '../video-generator');
@@ -32,41 +30,44 @@ async function processAudio() {
     const sceneAudioFiles = [];
     let totalDuration = 0;
 
-    // 2. Generate Audio for each Scene
-    for (const scene of script.scenes) {
-        console.log(`   Processing Scene ${scene.scene_id}: ${scene.section_type}`);
-
-        const tempFile = path.join(OUTPUT_AUDIO_DIR, `temp_scene_${scene.scene_id}.mp3`);
+    // 2. Generate Audio for all Scenes in one Python process (batch manifest)
+    const manifestPath = path.join(OUTPUT_AUDIO_DIR, 'tts_manifest.json');
+    const manifest = script.scenes.map(scene => ({
+        scene_id: scene.scene_id,
+        text: scene.narration_text,
+        output: path.join(OUTPUT_AUDIO_DIR, `temp_scene_${scene.scene_id}.mp3`)
+    }));
+    fs.writeFileSync(manifestPath, JSON.stringify(manifest, null, 2));
 
-        // Escape quotes for command line
-        const safeText = scene.narration_text.replace(/"/g, '\\"');
+    let batchResult;
+    try {
+        const { stdout } = await execFilePromise('python3', [PYTHON_SCRIPT, '--batch', manifestPath], { maxBuffer: 10 * 1024 * 1024 });
+        batchResult = JSON.parse(stdout);
+    } catch (error) {
+        console.error("❌ Failed to generate voice for scenes:", error.stdout || error);
+        // process.exit() skips finally blocks, so clean up the manifest first
+        fs.unlinkSync(manifestPath);
+        process.exit(1);
+    }
+    fs.unlinkSync(manifestPath);
 
-        // Call Python Script
-        const cmd = `python3 "${PYTHON_SCRIPT}" --text "${safeText}" --output "${tempFile}"`;
+    const resultsById = new Map(batchResult.results.map(r => [String(r.scene_id), r]));
 
-        try {
-            await execPromise(cmd);
-        } catch (error) {
-            console.error(`❌ Failed to generate voice for scene ${scene.scene_id}:`, error);
-            process.exit(1);
-        }
+    for (const scene of script.scenes) {
+        console.log(`   Processing Scene ${scene.scene_id}: ${scene.section_type}`);
+        const result = resultsById.get(String(scene.scene_id));
 
-        // 3. Measure Duration
-        try {
-            const duration = await getDuration(tempFile);
-            const adjustedDuration = Math.ceil(duration * 10) / 10 + 0.2; // Round up to 1 decimal place + buffer
+        // 3. Duration (measured by generate_voice.py in the same pass)
+        const duration = result.duration;
+        const adjustedDuration = Math.ceil(duration * 10) / 10 + 0.2; // Round up to 1 decimal place + buffer
 
-            console.log(`      Duration: ${duration.toFixed(2)}s -> Adjusted: ${adjustedDuration.toFixed(2)}s`);
+        console.log(`      Duration: ${duration.toFixed(2)}s -> Adjusted: ${adjustedDuration.toFixed(2)}s`);
 
-            // Update Scene Duration in JSON
-            scene.duration_sec = adjustedDuration;
-            totalDuration += adjustedDuration;
+        // Update Scene Duration in JSON
+        scene.duration_sec = adjustedDuration;
+        totalDuration += adjustedDuration;
 
-            sceneAudioFiles.push(tempFile);
-        } catch (error) {
-            console.error(`❌ Failed to measure duration for scene ${scene.scene_id}:`, error);
-            process.exit(1);
-        }
+        sceneAudioFiles.push(result.output);
     }
 
     // 4. Update Total Duration in Metadata
@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import json
+import hashlib
+
+# Normalized scene IR shared by the video, TTS and subtitle tools.
+#
+# Understands the three script formats found in content/scripts/ in a single pass:
+#   1. Brain JSON:   ```json {"scenes": [{"narration_text" | "audio_script", "screen_text", ...}]} ```
+#   2. Scene blocks: ## Scene N (type) / **ナレーション:** / **画面テキスト:**
+#   3. Legacy table: | Time | Visual | Audio | Note |
+#
+# The IR is cached next to the script as .<name>.ir.json, keyed by the script's sha256.
+
+IR_VERSION = 1
+
+SCENE_HEADER = re.compile(r'^#{2,3}\s*Scene\s*(\d+)\s*(?:\(([^)]*)\))?', re.IGNORECASE)
+FIELD_LABEL = re.compile(r'^\*\*\s*(ナレーション|画面テキスト|Narration|On-?screen text|Screen text)\s*[:：]\s*\*\*\s*(.*)$', re.IGNORECASE)
+AUDIO_PREFIX = re.compile(r'^(Narration\s*\d*:|Narrator:|Man:|Woman:|Visual:|Audio:)\s*', re.IGNORECASE)
+
+NARRATION_LABELS = ("ナレーション", "narration")
+
+def ir_cache_path(script_path):
+    directory, name = os.path.split(script_path)
+    return os.path.join(directory, f".{os.path.splitext(name)[0]}.ir.json")
+
+def _scene(index, narration, on_screen_text="", scene_type="", visual=""):
+    return {
+        "index": index,
+        "scene_type": scene_type,
+        "narration": narration.strip(),
+        "on_screen_text": on_screen_text.strip(),
+        "visual": visual.strip(),
+    }
+
+def _scenes_from_json(json_str):
+    try:
+        data = json.loads(json_str)
+    except json.JSONDecodeError as e:
+        print(f"⚠️ JSON found but failed to parse: {e}")
+        return []
+    scenes = []
+    for scene in data.get("scenes", []) if isinstance(data, dict) else []:
+        # Brain Ver 2.0 uses "narration_text", Brain Ver 1.0 used "audio_script"
+        text = scene.get("narration_text") or scene.get("audio_script") or ""
+        if text:
+            scenes.append(_scene(
+                len(scenes),
+                text,
+                scene.get("screen_text", ""),
+                scene.get("section_type", ""),
+                scene.get("visual_prompt", ""),
+            ))
+    return scenes
+
+def _clean_table_audio(text):
+    cleaned = AUDIO_PREFIX.sub('', text)
+    return cleaned.replace('**', '').replace('*', '').strip()
+
+def parse_lines(lines):
+    """Single streaming pass over the script. Returns (format, scenes)."""
+    json_scenes = []
+    block_scenes = []
+    table_scenes = []
+
+    in_json = False
+    json_buf = []
+    in_table = False
+    audio_col = visual_col = None
+    current = None   # scene block being filled
+    field = None     # "narration" | "on_screen_text"
+
+    def flush_block():
+        if current and current["narration"]:
+            block_scenes.append(_scene(len(block_scenes), current["narration"], current["on_screen_text"], current["scene_type"]))
+
+    for raw in lines:
+        line = raw.rstrip("\n")
+        stripped = line.strip()
+
+        # 1. Fenced JSON (first valid block wins)
+        if in_json:
+            if stripped.startswith("```"):
+                in_json = False
+                if not json_scenes:
+                    json_scenes = _scenes_from_json("\n".join(json_buf))
+                json_buf = []
+            else:
+                json_buf.append(line)
+            continue
+        if stripped.startswith("```json"):
+            in_json = True
+            continue
+
+        # 2. Legacy Markdown table
+        if "|" in line and "Audio" in line and "Visual" in line:
+            headers = [p.strip() for p in line.split("|")]
+            audio_col = headers.index("Audio") if "Audio" in headers else 3
+            visual_col = headers.index("Visual") if "Visual" in headers else 2
+            in_table = True
+            continue
+        if in_table:
+            if "|" not in line:
+                in_table = False
+            elif "---" in line:
+                continue
+            else:
+                parts = [p.strip() for p in line.split("|")]
+                if len(parts) > audio_col:
+                    audio_text = _clean_table_audio(parts[audio_col])
+                    if audio_text and audio_text != "Audio":
+                        visual = parts[visual_col] if len(parts) > visual_col else ""
+                        table_scenes.append(_scene(len(table_scenes), audio_text, visual=visual))
+                continue
+
+        # 3. Scene blocks
+        header = SCENE_HEADER.match(stripped)
+        if header:
+            flush_block()
+            current = {"scene_type": (header.group(2) or "").strip(), "narration": "", "on_screen_text": ""}
+            field = None
+            continue
+        if stripped.startswith("#"):
+            flush_block()
+            current = None
+            field = None
+            continue
+        if current is not None:
+            label = FIELD_LABEL.match(stripped)
+            if label:
+                field = "narration" if label.group(1).lower() in NARRATION_LABELS else "on_screen_text"
+                stripped = label.group(2).strip()
+            if field and stripped:
+                current[field] = f"{current[field]}\n{stripped}" if current[field] else stripped
+
+    flush_block()
+
+    for fmt, scenes in (("json", json_scenes), ("scenes", block_scenes), ("table", table_scenes)):
+        if scenes:
+            return fmt, scenes
+    return None, []
+
+def load_scenes(script_path, use_cache=True):
+    """Return the scene IR for script_path, from the .ir.json cache when the script is unchanged."""
+    if not os.path.exists(script_path):
+        print(f"Script not found: {script_path}")
+        return {"format": None, "scenes": []}
+
+    with open(script_path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    cache_path = ir_cache_path(script_path)
+
+    if use_cache:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("hash") == digest and cached.get("version") == IR_VERSION:
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    fmt, scenes = parse_lines(raw.decode("utf-8").splitlines())
+    ir = {"version": IR_VERSION, "hash": digest, "source": os.path.basename(script_path), "format": fmt, "scenes": scenes}
+
+    if use_cache and scenes:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(ir, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"⚠️ Could not write IR cache {cache_path}: {e}")
+    return ir
+
+def narration_segments(script_path):
+    """Narration text per scene, in script order."""
+    return [scene["narration"] for scene in load_scenes(script_path)["scenes"]]
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 script_parser.py <script.md> [--no-cache]")
+        sys.exit(1)
+    ir = load_scenes(sys.argv[1], use_cache="--no-cache" not in sys.argv)
+    print(json.dumps(ir, ensure_ascii=False, indent=2))
@@ -0,0 +1,133 @@
+import os
+import re
+import sys
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import llm_client
+
+# Section-aware digest of long Markdown documents (articles, brand bibles) for prompts.
+#
+# Instead of slicing content[:N] (which cuts mid-sentence and drops the end of the
+# article), the document is split on its "## " headings and each section is summarized
+# in parallel. Summaries are cached by sha256 of the section text, so an edited article
+# only re-summarizes the sections that actually changed. Short sections pass through.
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CACHE_DIR = os.getenv("DIGEST_CACHE_DIR", os.path.join(REPO_ROOT, ".cache", "digest"))
+DIGEST_MODEL = os.getenv("DIGEST_MODEL", "gemini-2.0-flash")
+DIGEST_VERSION = 1
+
+SHORT_SECTION_CHARS = 600   # sections up to this size are kept verbatim
+SUMMARY_CHARS = 400         # target summary length per section
+FALLBACK_CHARS = 800        # used when a summary call fails
+
+HEADING = re.compile(r'^##\s+(.*)$')
+TAG = re.compile(r'<[^>]+>')
+
+def strip_front_matter(text):
+    if text.startswith('---'):
+        end = text.find('\n---', 3)
+        if end != -1:
+            return text[end + 4:].lstrip('\n')
+    return text
+
+def split_sections(text):
+    """[(heading, body)] split on level-2 headings; the lead before the first one has heading ""."""
+    sections = []
+    heading, lines = "", []
+    for line in strip_front_matter(text).splitlines():
+        match = HEADING.match(line)
+        if match:
+            if heading or "".join(lines).strip():
+                sections.append((heading, "\n".join(lines).strip()))
+            heading, lines = match.group(1).strip(), []
+        else:
+            lines.append(line)
+    if heading or "".join(lines).strip():
+        sections.append((heading, "\n".join(lines).strip()))
+    return sections
+
+def plain(text):
+    """Drop HTML tags and collapse blank lines; the models don't need the markup."""
+    text = TAG.sub('', text)
+    return re.sub(r'\n\s*\n+', '\n', text).strip()
+
+def section_hash(heading, body):
+    payload = f"{DIGEST_VERSION}\0{DIGEST_MODEL}\0{SUMMARY_CHARS}\0{heading}\0{body}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.txt")
+
+def _cache_get(key):
+    try:
+        with open(_cache_path(key), 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _cache_put(key, summary):
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(summary)
+    os.replace(tmp_path, path)
+
+def summarize_section(heading, body):
+    """Summary for one section: cached, verbatim when short, truncated if the model fails."""
+    text = plain(body)
+    if len(text) <= SHORT_SECTION_CHARS:
+        return text
+
+    key = section_hash(heading, body)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    prompt = f"""
+    以下は記事（または資料）の一節です。SNS投稿の素材として使うため、
+    主張・数字・固有名詞・結論を落とさずに{SUMMARY_CHARS}文字以内で要約してください。
+    要約本文のみを出力してください。
+
+    【見出し】{heading or "（導入）"}
+    【本文】
+    {text}
+    """
+    try:
+        summary = llm_client.call_gemini(prompt, DIGEST_MODEL).strip()
+    except Exception as e:
+        print(f"⚠️ Section digest failed for '{heading or 'lead'}': {e}")
+        return text[:FALLBACK_CHARS]
+    if not summary:
+        return text[:FALLBACK_CHARS]
+    _cache_put(key, summary)
+    return summary
+
+def build_digest(text, workers=4):
+    """Compact digest of the whole document, one block per section in original order."""
+    sections = split_sections(text)
+    if not sections:
+        return ""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sections)))) as pool:
+        summaries = list(pool.map(lambda s: summarize_section(*s), sections))
+    blocks = []
+    for (heading, _), summary in zip(sections, summaries):
+        blocks.append(f"## {heading}\n{summary}" if heading else summary)
+    return "\n\n".join(blocks)
+
+def digest_file(path, workers=4):
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_digest(f.read(), workers)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 section_digest.py <file.md>")
+        sys.exit(1)
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+    load_dotenv(".env.local")
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    print(digest_file(sys.argv[1]))
@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+
+# O(1) slug -> path lookup for the content directories, replacing glob("*{slug}*") scans.
+#
+# Every file is reachable by its full ("dated") slug, e.g. 2026-01-29-5713b1fa, and by its
+# bare slug with the YYYY-MM-DD- prefix removed, e.g. 5713b1fa. A bare slug that exists on
+# several dates resolves to the latest date unless an explicit date is given.
+# The map is rebuilt only when the directory's mtime changes (file added/removed/renamed).
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATE_PREFIX = re.compile(r'^(\d{4}-\d{2}-\d{2})-(.+)$')
+
+# kind -> (directory relative to the repo root, filename suffix after the slug)
+KINDS = {
+    "articles": ("content/articles", ".md"),
+    "scripts": ("content/scripts", ".md"),
+    "prompts": ("content/prompts", "_prompts.md"),
+    "video_prompts": ("content/prompts", "_video_prompts.txt"),
+    "social": ("content/social", "_posts.md"),
+}
+
+class SlugResolver:
+    def __init__(self, directory, suffix):
+        self.directory = directory
+        self.suffix = suffix
+        self._dir_mtime = None
+        self._exact = {}
+        self._bare = {}
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            self._dir_mtime, self._exact, self._bare = None, {}, {}
+            return
+        if mtime == self._dir_mtime:
+            return
+
+        exact, bare = {}, {}
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            stem = name[:-len(self.suffix)]
+            path = os.path.relpath(os.path.join(self.directory, name), REPO_ROOT)
+            exact[stem] = path
+            dated = DATE_PREFIX.match(stem)
+            if dated:
+                bare.setdefault(dated.group(2), []).append((dated.group(1), path))
+        for candidates in bare.values():
+            candidates.sort(reverse=True)  # latest date first
+        self._dir_mtime, self._exact, self._bare = mtime, exact, bare
+
+    def resolve(self, slug, date=None):
+        """Canonical path for a bare or dated slug, or None."""
+        self._refresh()
+        if date:
+            return self._exact.get(f"{date}-{slug}") or (self._exact.get(slug) if slug.startswith(date) else None)
+        if slug in self._exact:
+            return self._exact[slug]
+        candidates = self._bare.get(slug)
+        return candidates[0][1] if candidates else None
+
+    def candidates(self, slug):
+        """All (date, path) pairs for a bare slug, latest first."""
+        self._refresh()
+        return list(self._bare.get(slug, []))
+
+_resolvers = {}
+
+def get_resolver(kind):
+    if kind not in _resolvers:
+        directory, suffix = KINDS[kind]
+        _resolvers[kind] = SlugResolver(os.path.join(REPO_ROOT, directory), suffix)
+    return _resolvers[kind]
+
+def resolve(kind, slug, date=None):
+    return get_resolver(kind).resolve(slug, date)
+
+def resolve_or_default(kind, slug, date=None):
+    """Resolved path, or the conventional <dir>/<slug><suffix> path when nothing matches."""
+    directory, suffix = KINDS[kind]
+    return resolve(kind, slug, date) or os.path.join(directory, f"{slug}{suffix}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in KINDS:
+        print(f"Usage: python3 slug_resolver.py <{'|'.join(KINDS)}> <slug> [YYYY-MM-DD]")
+        sys.exit(1)
+    path = resolve(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    if not path:
+        print(f"❌ Not found: {sys.argv[2]}", file=sys.stderr)
+        sys.exit(1)
+    print(path)
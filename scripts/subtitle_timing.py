@@ -0,0 +1,59 @@
+# Subtitle tracks built from the WordBoundary timing captured by tts_cache.synthesize().
+# Words are {"text", "start", "end"} in seconds; cues group words into readable lines.
+
+SENTENCE_BREAKS = ("。", "！", "？", "!", "?", ".")
+CLAUSE_BREAKS = ("、", ",", "，")
+
+def offset_words(words, offset):
+    """Shift a segment's words onto the timeline of the concatenated track."""
+    return [dict(w, start=round(w["start"] + offset, 3), end=round(w["end"] + offset, 3)) for w in words]
+
+def build_cues(words, max_chars=16, max_gap=0.6):
+    """Group words into cues, breaking at punctuation, long pauses or max_chars."""
+    cues = []
+    current = None
+    for word in words:
+        if current and (word["start"] - current["end"] > max_gap
+                        or len(current["text"]) + len(word["text"]) > max_chars):
+            cues.append(current)
+            current = None
+        if current is None:
+            current = {"text": word["text"], "start": word["start"], "end": word["end"]}
+        else:
+            # Japanese has no spaces between tokens; keep them for latin text
+            sep = " " if current["text"][-1:].isascii() and word["text"][:1].isascii() else ""
+            current["text"] += sep + word["text"]
+            current["end"] = word["end"]
+        if current["text"].endswith(SENTENCE_BREAKS + CLAUSE_BREAKS):
+            cues.append(current)
+            current = None
+    if current:
+        cues.append(current)
+    return cues
+
+def _timestamp(seconds, sep):
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+def to_srt(cues):
+    blocks = []
+    for i, cue in enumerate(cues, 1):
+        blocks.append(f"{i}\n{_timestamp(cue['start'], ',')} --> {_timestamp(cue['end'], ',')}\n{cue['text']}\n")
+    return "\n".join(blocks)
+
+def to_vtt(cues):
+    blocks = ["WEBVTT\n"]
+    for cue in cues:
+        blocks.append(f"{_timestamp(cue['start'], '.')} --> {_timestamp(cue['end'], '.')}\n{cue['text']}\n")
+    return "\n".join(blocks)
+
+def write_subtitles(path, words, **cue_options):
+    """Write words as .srt or .vtt (by extension)."""
+    cues = build_cues(words, **cue_options)
+    text = to_vtt(cues) if path.lower().endswith(".vtt") else to_srt(cues)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return len(cues)
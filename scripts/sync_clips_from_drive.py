@@ -1,92 +1,42 @@
 import os
 import sys
 import re
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 import io
-from google.oauth2 import service_account
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from dotenv import load_dotenv
 import json
+import argparse
+from googleapiclient.errors import HttpError
+from drive_client import get_service, list_all, PARENT_FOLDER_ID
 
-# Load environment variables
-load_dotenv(".env.local")
-PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID")
-SCOPES = ['https://www.googleapis.com/auth/drive']
-
-def authenticate():
-    """Authenticates using User OAuth Token (Cloud/Local) or Service Account."""
-    creds = None
-    
-    # 1. Try User OAuth Token from Environment Variable (GitHub Actions / Cloud)
-    token_info = os.getenv("GOOGLE_DRIVE_TOKEN_JSON")
-    if token_info:
-        print("🔐 Authenticating via User OAuth Token (Env Var)...")
-        info = json.loads(token_info)
-        creds = Credentials.from_authorized_user_info(info, SCOPES)
-        return build('drive', 'v3', credentials=creds)
-
-    # 2. Try Local token.json
-    if os.path.exists('token.json'):
-        print("👤 Authenticating via Local token.json...")
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    # Refresh if expired
-    if creds and creds.expired and creds.refresh_token:
-        print("🔄 Refreshing expired token...")
-        try:
-            creds.refresh(Request())
-            with open('token.json', 'w') as token:
-                token.write(creds.to_json())
-        except Exception as e:
-            print(f"⚠️ Failed to refresh token: {e}")
-            creds = None
-
-    if creds and creds.valid:
-        return build('drive', 'v3', credentials=creds)
-
-    # 3. Try Service Account (Fallback)
-    service_account_info = os.getenv("GOOGLE_SERVICE_ACCOUNT_INFO")
-    if service_account_info:
-        print("🤖 Authenticating via Service Account (Env Var)...")
-        info = json.loads(service_account_info)
-        creds = service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
-        return build('drive', 'v3', credentials=creds)
-
-    # 4. Final Fallback: Full Interactive Login (Local Only)
-    print("❌ No valid credentials found. Starting interactive login...")
-    flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-    creds = flow.run_local_server(port=0)
-    with open('token.json', 'w') as token:
-        token.write(creds.to_json())
-    return build('drive', 'v3', credentials=creds)
-
-def sync_project_clips(service, project_folder_name, project_folder_id):
+# Changes API state: page token + project/clips folder ids learned on the last scan
+STATE_PATH = os.getenv("CLIP_SYNC_STATE", os.path.join(os.path.dirname(__file__), "..", ".cache", "drive_clip_sync.json"))
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+PROJECT_NAME = re.compile(r'^\d{4}-\d{2}-\d{2}_')
+
+def sync_project_clips(service, project_folder_name, project_folder_id, clips_folder_id=None):
+    """Download new clips for one project. Returns the clips folder id (None if missing)."""
     slug = project_folder_name.split('_')[-1]
     local_clips_dir = os.path.join('projects', slug, 'clips')
     if not os.path.exists(local_clips_dir):
         os.makedirs(local_clips_dir, exist_ok=True)
 
-    # 1. Find 'clips' subfolder in Drive
-    query = f"name = 'clips' and '{project_folder_id}' in parents and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
-    results = service.files().list(q=query, fields="files(id, name)", supportsAllDrives=True).execute()
-    clips_folders = results.get('files', [])
-    if not clips_folders:
-        print(f"   [SKIP] No 'clips' folder found for {slug}")
-        return
-
-    clips_folder_id = clips_folders[0]['id']
+    # 1. Find 'clips' subfolder in Drive (known from the sync state on incremental runs)
+    if not clips_folder_id:
+        query = f"name = 'clips' and '{project_folder_id}' in parents and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
+        results = service.files().list(q=query, fields="files(id, name)", supportsAllDrives=True).execute()
+        clips_folders = results.get('files', [])
+        if not clips_folders:
+            print(f"   [SKIP] No 'clips' folder found for {slug}")
+            return None
+        clips_folder_id = clips_folders[0]['id']
 
     # 2. List all mp4 files in Drive 'clips' folder
     query = f"'{clips_folder_id}' in parents and mimeType = 'video/mp4' and trashed = false"
-    results = service.files().list(q=query, fields="files(id, name)", supportsAllDrives=True).execute()
-    drive_clips = results.get('files', [])
+    drive_clips = list_all(service, q=query, fields="files(id, name)", supportsAllDrives=True)
 
     if not drive_clips:
         print(f"   [EMPTY] No mp4 clips in Drive for {slug}")
-        return
+        return clips_folder_id
 
     print(f"🎬 Syncing {len(drive_clips)} clips for {slug}...")
 
@@ -119,24 +69,125 @@ def sync_project_clips(service, project_folder_name, project_folder_id):
         while done is False:
             status, done = downloader.next_chunk()
         print(f"   [DONE]")
-
-def main():
-    service = authenticate()
-    if not PARENT_FOLDER_ID:
-        print("Error: GOOGLE_DRIVE_FOLDER_ID not found.")
-        sys.exit(1)
+    return clips_folder_id
+
+def load_state():
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("parent_folder_id") == PARENT_FOLDER_ID and state.get("page_token"):
+            return state
+    except (OSError, ValueError):
+        pass
+    return None
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp_path = f"{STATE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+def start_page_token(service):
+    return service.changes().getStartPageToken(supportsAllDrives=True).execute()['startPageToken']
+
+def full_scan(service):
+    """Original behaviour: visit every project folder. Returns a fresh sync state."""
+    # Take the token first so changes made during the scan are seen next run
+    token = start_page_token(service)
 
     # List all project folders (YYYY-MM-DD_slug)
-    query = f"'{PARENT_FOLDER_ID}' in parents and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
-    results = service.files().list(q=query, fields="files(id, name)", supportsAllDrives=True).execute()
-    projects = results.get('files', [])
+    query = f"'{PARENT_FOLDER_ID}' in parents and mimeType = '{FOLDER_MIME}' and trashed = false"
+    projects = list_all(service, q=query, fields="files(id, name)", supportsAllDrives=True)
 
     print(f"🔍 Found {len(projects)} projects on Drive. Checking for clips to sync...")
 
+    state = {"parent_folder_id": PARENT_FOLDER_ID, "page_token": token, "projects": {}}
     for project in projects:
         # Only process folders that match the naming pattern
-        if re.match(r'^\d{4}-\d{2}-\d{2}_', project['name']):
-            sync_project_clips(service, project['name'], project['id'])
+        if PROJECT_NAME.match(project['name']):
+            clips_id = sync_project_clips(service, project['name'], project['id'])
+            state["projects"][project['id']] = {"name": project['name'], "clips_folder_id": clips_id}
+    return state
+
+def fetch_changes(service, token):
+    """All changes since token. Returns (changes, new start token)."""
+    changes = []
+    while True:
+        response = service.changes().list(
+            pageToken=token,
+            spaces='drive',
+            pageSize=1000,
+            includeRemoved=True,
+            supportsAllDrives=True,
+            includeItemsFromAllDrives=True,
+            fields="nextPageToken, newStartPageToken, changes(fileId, removed, file(id, name, mimeType, parents, trashed))",
+        ).execute()
+        changes.extend(response.get('changes', []))
+        if 'newStartPageToken' in response:
+            return changes, response['newStartPageToken']
+        token = response['nextPageToken']
+
+def incremental_sync(service, state):
+    """Visit only the projects whose clips changed since the saved page token."""
+    changes, new_token = fetch_changes(service, state["page_token"])
+    projects = state["projects"]
+    clips_to_project = {p["clips_folder_id"]: pid for pid, p in projects.items() if p.get("clips_folder_id")}
+
+    dirty = set()
+    for change in changes:
+        file = change.get('file')
+        if change.get('removed') or not file or file.get('trashed'):
+            continue
+        parents = file.get('parents', [])
+        if file['mimeType'] == FOLDER_MIME:
+            if PARENT_FOLDER_ID in parents and PROJECT_NAME.match(file['name']):
+                # New (or renamed) project folder
+                known = projects.setdefault(file['id'], {"clips_folder_id": None})
+                known["name"] = file['name']
+                dirty.add(file['id'])
+            elif file['name'] == 'clips':
+                for parent in parents:
+                    if parent in projects:
+                        projects[parent]["clips_folder_id"] = file['id']
+                        clips_to_project[file['id']] = parent
+                        dirty.add(parent)
+        elif file['mimeType'] == 'video/mp4':
+            for parent in parents:
+                if parent in clips_to_project:
+                    dirty.add(clips_to_project[parent])
+
+    print(f"🔍 {len(changes)} Drive changes since last sync, {len(dirty)} project(s) to check.")
+    for project_id in sorted(dirty, key=lambda pid: projects[pid]["name"]):
+        project = projects[project_id]
+        project["clips_folder_id"] = sync_project_clips(service, project["name"], project_id, project.get("clips_folder_id"))
+
+    state["page_token"] = new_token
+    return state
+
+def main():
+    parser = argparse.ArgumentParser(description="Download numbered Veo clips from Drive project folders.")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved Changes API token and scan every project")
+    args = parser.parse_args()
+
+    service = get_service()
+    if not PARENT_FOLDER_ID:
+        print("Error: GOOGLE_DRIVE_FOLDER_ID not found.")
+        sys.exit(1)
+
+    state = None if args.full else load_state()
+    if state:
+        try:
+            state = incremental_sync(service, state)
+        except HttpError as e:
+            if e.resp.status not in (400, 404):
+                raise
+            # Expired/invalid page token
+            print(f"⚠️ Change token rejected ({e.resp.status}); falling back to a full scan.")
+            state = full_scan(service)
+    else:
+        state = full_scan(service)
+    save_state(state)
 
 if __name__ == '__main__':
     main()
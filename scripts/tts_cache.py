@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic renames still keep entries consistent
+    fcntl = None
+
+# Content-addressed narration cache shared by auto_video_maker.py and generate_voice.py.
+# Layout: <cache_dir>/<key[:2]>/<key>.mp3 + <key>.json (duration and request metadata).
+# LRU clock is the mp3 mtime, bumped on every hit.
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(REPO_ROOT, ".cache", "tts"))
+DEFAULT_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024)
+# Once over the limit, evict down to this fraction so the following puts don't rescan at once
+EVICT_LOW_WATER = 0.9
+
+# edge_tts streams "audio-24khz-48kbitrate-mono-mp3" (CBR), so byte count gives exact duration
+EDGE_TTS_BYTES_PER_SEC = 48000 / 8
+# WordBoundary offsets/durations are in 100ns ticks
+TICKS_PER_SEC = 10_000_000
+# Bump when the cached meta layout changes so old entries miss instead of lacking fields
+CACHE_SCHEMA = 2
+
+def engine_version():
+    try:
+        import edge_tts
+        return getattr(edge_tts, "__version__", "unknown")
+    except ImportError:
+        return "unknown"
+
+class TTSCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # running byte total; None until the first evict() scan
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text, voice, rate="+0%", pitch="+0Hz", engine=None):
+        payload = json.dumps({
+            "text": text,
+            "voice": voice,
+            "rate": rate,
+            "pitch": pitch,
+            "engine": engine or engine_version(),
+            "schema": CACHE_SCHEMA,
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        shard = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(shard, f"{key}.mp3"), os.path.join(shard, f"{key}.json")
+
+    @contextmanager
+    def _lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.cache_dir, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """Return (mp3_path, meta) on hit, None on miss."""
+        mp3_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(mp3_path)  # LRU touch; raises if the mp3 was evicted meanwhile
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return mp3_path, meta
+
+    def fetch(self, key, dest):
+        """Copy a cached entry to dest. Returns its meta, or None on miss."""
+        entry = self.get(key)
+        if not entry:
+            return None
+        mp3_path, meta = entry
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        try:
+            shutil.copyfile(mp3_path, dest)
+        except FileNotFoundError:
+            # Evicted by another process between get() and the copy
+            self.hits -= 1
+            self.misses += 1
+            return None
+        return meta
+
+    def put(self, key, src_path, meta):
+        """Store src_path under key. Safe against concurrent writers of the same key."""
+        mp3_path, meta_path = self._paths(key)
+        shard = os.path.dirname(mp3_path)
+        os.makedirs(shard, exist_ok=True)
+
+        # Write to temp files in the same directory, then rename into place atomically
+        fd, tmp_mp3 = tempfile.mkstemp(dir=shard, suffix=".mp3.tmp")
+        os.close(fd)
+        shutil.copyfile(src_path, tmp_mp3)
+        fd, tmp_meta = tempfile.mkstemp(dir=shard, suffix=".json.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(dict(meta, created_at=time.time()), f, ensure_ascii=False)
+        os.replace(tmp_mp3, mp3_path)
+        os.replace(tmp_meta, meta_path)  # meta last: readers only see complete entries
+
+        # Only walk the tree when the running total (rescanned by evict()) could exceed the limit
+        size = os.path.getsize(mp3_path)
+        if self._size is None or self._size + size > self.max_bytes:
+            self.evict()
+        else:
+            self._size += size
+        return mp3_path
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes (with headroom)."""
+        with self._lock():
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(".mp3"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+
+            if total <= self.max_bytes:
+                self._size = total
+                return 0
+
+            removed = 0
+            target = int(self.max_bytes * EVICT_LOW_WATER)
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                for victim in (path, path[:-len(".mp3")] + ".json"):
+                    try:
+                        os.remove(victim)
+                    except OSError:
+                        pass
+                total -= size
+                removed += 1
+            self._size = total
+            return removed
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+_default_cache = None
+
+def get_cache():
+    """Process-wide cache instance (TTS_CACHE=off disables caching)."""
+    global _default_cache
+    if os.getenv("TTS_CACHE", "on").lower() in ("0", "off", "false"):
+        return None
+    if _default_cache is None:
+        _default_cache = TTSCache()
+    return _default_cache
+
+def _communicate(text, voice, rate, pitch):
+    import edge_tts
+    try:
+        return edge_tts.Communicate(text, voice, rate=rate, pitch=pitch, boundary="WordBoundary")
+    except TypeError:  # edge_tts < 7 always emits WordBoundary and has no boundary kwarg
+        return edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
+
+async def stream_to_file(text, voice, output, rate="+0%", pitch="+0Hz"):
+    """Synthesize to output in one pass, capturing WordBoundary timing as it streams.
+
+    Returns {"duration", "words": [{"text", "start", "end"}]} with times in seconds;
+    no separate decode/measure step is needed afterwards.
+    """
+    words = []
+    audio_bytes = 0
+    with open(output, "wb") as f:
+        async for chunk in _communicate(text, voice, rate, pitch).stream():
+            if chunk["type"] == "audio":
+                f.write(chunk["data"])
+                audio_bytes += len(chunk["data"])
+            elif chunk["type"] == "WordBoundary":
+                start = chunk["offset"] / TICKS_PER_SEC
+                words.append({
+                    "text": chunk["text"],
+                    "start": round(start, 3),
+                    "end": round(start + chunk["duration"] / TICKS_PER_SEC, 3),
+                })
+    return {"duration": round(audio_bytes / EDGE_TTS_BYTES_PER_SEC, 3), "words": words}
+
+async def synthesize(text, voice, output, rate="+0%", pitch="+0Hz", cache=None):
+    """Write narration for text to output, going through the cache.
+
+    Returns meta with duration and word-level timing.
+    """
+    if cache is None:
+        cache = get_cache()
+    key = TTSCache.make_key(text, voice, rate, pitch) if cache else None
+
+    if cache:
+        meta = cache.fetch(key, output)
+        if meta is not None:
+            return dict(meta, output=output, cached=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    timing = await stream_to_file(text, voice, output, rate, pitch)
+    meta = dict(timing, voice=voice, rate=rate, pitch=pitch)
+
+    if cache:
+        cache.put(key, output, meta)
+    return dict(meta, output=output, cached=False)
@@ -1,47 +1,7 @@
-
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
 from googleapiclient.http import MediaFileUpload
 import os
 import sys
-import glob
-
-# --- Auth ---
-SCOPES = ['https://www.googleapis.com/auth/drive']
-KEY_FILE_PATH = os.path.join(os.path.dirname(__file__), '../service_account.json')
-from dotenv import load_dotenv
-
-# --- Auth ---
-SCOPES = ['https://www.googleapis.com/auth/drive']
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-
-# --- Auth ---
-SCOPES = ['https://www.googleapis.com/auth/drive']
-
-load_dotenv(".env.local")
-if not os.getenv("GOOGLE_DRIVE_FOLDER_ID"):
-    load_dotenv() # try default .env
-
-PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID")
-
-def authenticate():
-    creds = None
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
-
-    return build('drive', 'v3', credentials=creds)
+from drive_client import get_service, PARENT_FOLDER_ID
 
 def find_latest_folder(service, slug):
     # Search for folder that matches the "YYYY-MM-DD_slug" pattern mostly by checking name containment
@@ -100,7 +60,7 @@ def main():
         print(f"File not found: {file_path}")
         sys.exit(1)
 
-    service = authenticate()
+    service = get_service()
     folder = find_latest_folder(service, slug)
     
     if not folder:
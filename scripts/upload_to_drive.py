@@ -2,83 +2,20 @@ import os
 import datetime
 import sys
 import glob
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google.oauth2 import service_account
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from dotenv import load_dotenv
+import re
 import json
+import time
+import hashlib
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from googleapiclient.http import MediaFileUpload
+from drive_client import get_service, ensure_folders, list_all, PARENT_FOLDER_ID
+import slug_resolver
 
-# Load environment variables
-load_dotenv(".env.local")
-
-# Wrapper to handle both .env and .env.local
-if not os.getenv("GOOGLE_DRIVE_FOLDER_ID"):
-    load_dotenv()
-
-PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID")
-SCOPES = ['https://www.googleapis.com/auth/drive']
-
-def authenticate():
-    """Authenticates using User OAuth Token (Cloud/Local) or Service Account."""
-    creds = None
-    
-    # 1. Try User OAuth Token from Environment Variable (GitHub Actions / Cloud)
-    token_info = os.getenv("GOOGLE_DRIVE_TOKEN_JSON")
-    if token_info:
-        print("🔐 Authenticating via User OAuth Token (Env Var)...")
-        info = json.loads(token_info)
-        creds = Credentials.from_authorized_user_info(info, SCOPES)
-        return build('drive', 'v3', credentials=creds)
-
-    # 2. Try Local token.json
-    if os.path.exists('token.json'):
-        print("👤 Authenticating via Local token.json...")
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    # Refresh if expired
-    if creds and creds.expired and creds.refresh_token:
-        print("🔄 Refreshing expired token...")
-        try:
-            creds.refresh(Request())
-            with open('token.json', 'w') as token:
-                token.write(creds.to_json())
-        except Exception as e:
-            print(f"⚠️ Failed to refresh token: {e}")
-            creds = None
-
-    if creds and creds.valid:
-        return build('drive', 'v3', credentials=creds)
-
-    # 3. Try Service Account (Fallback for specific tasks if needed)
-    service_account_info = os.getenv("GOOGLE_SERVICE_ACCOUNT_INFO")
-    service_account_path = 'service_account_key.json'
-    
-    if service_account_info:
-        print("🤖 Authenticating via Service Account (Env Var)...")
-        info = json.loads(service_account_info)
-        creds = service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
-    elif os.path.exists(service_account_path):
-        print("🤖 Authenticating via Service Account (Key File)...")
-        creds = service_account.Credentials.from_service_account_file(service_account_path, scopes=SCOPES)
-    
-    if creds:
-        return build('drive', 'v3', credentials=creds)
-
-    # 4. Final Fallback: Full Interactive Login (Local Only)
-    print("❌ No valid credentials found. Starting interactive login...")
-    if not os.path.exists('credentials.json'):
-        print("❌ Error: credentials.json not found.")
-        sys.exit(1)
-        
-    flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-    creds = flow.run_local_server(port=0)
-    with open('token.json', 'w') as token:
-        token.write(creds.to_json())
-
-    return build('drive', 'v3', credentials=creds)
+UPLOAD_WORKERS = int(os.getenv("DRIVE_UPLOAD_WORKERS", "4"))
+# path -> Drive fileId + local md5, needed for converted Google Docs (they have no md5Checksum)
+MANIFEST_PATH = os.getenv("DRIVE_MANIFEST_PATH", os.path.join(os.path.dirname(__file__), "..", ".cache", "drive_manifest.json"))
 
 def create_folder(service, name, parent_id):
     """Create a folder and return its ID."""
@@ -103,7 +40,7 @@ def create_folder(service, name, parent_id):
         print(f"Created folder '{name}'. ID: {file.get('id')}")
         return file.get('id')
 
-def upload_file(service, file_path, folder_id):
+def display_name_for(file_path):
     name = os.path.basename(file_path)
     
     # Rename Logic for Clarity
@@ -133,6 +70,20 @@ def upload_file(service, file_path, folder_id):
         display_name = f"【種画像】{name}"
     elif name.endswith(".mp4"):
         display_name = f"【動画】{name}"
+    return display_name
+
+def is_doc_upload(file_path):
+    """Markdown (and telop text) is converted to a Google Doc on upload."""
+    return file_path.endswith('.md') or (file_path.endswith('.txt') and "テロップ" in os.path.basename(file_path))
+
+def drive_name_for(file_path):
+    display_name = display_name_for(file_path)
+    return os.path.splitext(display_name)[0] if is_doc_upload(file_path) else display_name
+
+def upload_file(service, file_path, folder_id, existing_id=None):
+    """Create the Drive file, or replace the content of existing_id in place."""
+    name = os.path.basename(file_path)
+    display_name = display_name_for(file_path)
 
     file_metadata = {
         'name': display_name,
@@ -143,7 +94,7 @@ def upload_file(service, file_path, folder_id):
     target_mime = None
     source_mime = None
     
-    if file_path.endswith('.md') or (file_path.endswith('.txt') and "テロップ" in name):
+    if is_doc_upload(file_path):
         print(f"🔄 Converting to Google Doc: {display_name}")
         target_mime = 'application/vnd.google-apps.document'
         # Force text/plain for MD/TXT to ensure conversion works
@@ -160,8 +111,20 @@ def upload_file(service, file_path, folder_id):
     # Pass explicit source mime if needed (critical for conversion)
     media = MediaFileUpload(file_path, resumable=True, mimetype=source_mime)
     
-    print(f"Uploading {display_name}...")
     try:
+        if existing_id:
+            print(f"Updating {display_name} in place...")
+            file = service.files().update(
+                fileId=existing_id,
+                body={'name': file_metadata['name']},
+                media_body=media,
+                fields='id, webViewLink',
+                supportsAllDrives=True
+            ).execute()
+            print(f"✅ Updated ({file.get('id')})")
+            return file
+
+        print(f"Uploading {display_name}...")
         # supportsAllDrives=True is critical if the target is a Shared Drive
         file = service.files().create(
             body=file_metadata,
@@ -175,43 +138,185 @@ def upload_file(service, file_path, folder_id):
         print(f"❌ Failed to upload {name}: {e}")
         return None
 
+def file_md5(path):
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(MANIFEST_PATH), suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def manifest_key(file_path, folder_id):
+    return f"{folder_id}:{os.path.normpath(file_path)}"
+
+def list_folder(service, folder_id):
+    """{fileId: file} for the live (non-trashed) files in a folder."""
+    query = f"'{folder_id}' in parents and trashed = false"
+    files = list_all(service, q=query, fields="files(id, name, md5Checksum)", supportsAllDrives=True, includeItemsFromAllDrives=True)
+    return {f['id']: f for f in files}
+
+def plan_upload(md5, remote, entry):
+    """("skip" | "update" | "create", fileId) for one asset.
+
+    remote: the Drive file this path maps to (from the manifest), or None.
+    Binary files are compared with Drive's md5Checksum; converted Docs have none, so
+    the hash recorded in the manifest at the last upload is used instead.
+    """
+    if not remote:
+        return "create", None
+    remote_md5 = remote.get('md5Checksum') or (entry or {}).get('md5')
+    if remote_md5 == md5:
+        return "skip", remote['id']
+    return "update", remote['id']
+
+def upload_job(service, file_path, folder_id, remote=None, entry=None, sync=True):
+    """Sync one asset; runs on a pool thread (drive_client gives it its own transport)."""
+    size = os.path.getsize(file_path)
+    started = time.time()
+    md5 = file_md5(file_path)
+    action, file_id = plan_upload(md5, remote, entry) if sync else ("create", None)
+    if action == "skip":
+        print(f"⏭️ Unchanged: {os.path.basename(file_path)}")
+        file = {'id': file_id}
+    else:
+        file = upload_file(service, file_path, folder_id, existing_id=file_id)
+    return {
+        "path": file_path,
+        "folder_id": folder_id,
+        "action": action,
+        "ok": file is not None,
+        "id": file.get('id') if file else None,
+        "md5": md5,
+        "bytes": size if action != "skip" else 0,
+        "seconds": round(time.time() - started, 2),
+    }
+
+def match_remote(file_path, folder_id, listing, manifest):
+    """The Drive file previously uploaded from this path, if it still exists."""
+    entry = manifest.get(manifest_key(file_path, folder_id))
+    if entry and entry.get("id") in listing:
+        return listing[entry["id"]], entry
+    # No manifest record (e.g. first run on another machine): match by the Drive name
+    name = drive_name_for(file_path)
+    for remote in listing.values():
+        if remote['name'] == name:
+            return remote, None
+    return None, None
+
+def upload_assets(service, assets, workers=UPLOAD_WORKERS, sync=True):
+    """Upload [(path, folder_id)] on a bounded pool, largest files first so the MP4's
+    resumable upload overlaps with the many small files. In sync mode unchanged files are
+    skipped and changed ones updated in place. Returns per-file rows."""
+    present = []
+    for asset_path, target_id in assets:
+        if os.path.exists(asset_path):
+            present.append((asset_path, target_id))
+        else:
+            print(f"⚠️ Skipping missing asset: {asset_path}")
+    present.sort(key=lambda a: os.path.getsize(a[0]), reverse=True)
+
+    manifest = load_manifest() if sync else {}
+    listings = {}
+    if sync:
+        for folder_id in {folder_id for _, folder_id in present}:
+            listings[folder_id] = list_folder(service, folder_id)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = []
+        for path, folder_id in present:
+            remote, entry = match_remote(path, folder_id, listings[folder_id], manifest) if sync else (None, None)
+            futures.append(pool.submit(upload_job, service, path, folder_id, remote, entry, sync))
+        results = [f.result() for f in futures]
+
+    for r in results:
+        if r["ok"]:
+            manifest[manifest_key(r["path"], r["folder_id"])] = {"id": r["id"], "md5": r["md5"]}
+    save_manifest(manifest)
+    return results
+
+def print_report(results, wall_seconds):
+    total_bytes = sum(r["bytes"] for r in results)
+    serial_seconds = sum(r["seconds"] for r in results)
+    print("\n📊 Upload report")
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        icon = "✅" if r["ok"] else "❌"
+        print(f"  {icon} {r['action']:6} {r['seconds']:7.2f}s {r['bytes'] / 1024:10.1f} KB  {r['path']}")
+    failed = sum(1 for r in results if not r["ok"])
+    counts = {action: sum(1 for r in results if r["action"] == action) for action in ("create", "update", "skip")}
+    print(f"  {len(results) - failed}/{len(results)} files ({counts['create']} created, {counts['update']} updated, "
+          f"{counts['skip']} unchanged), {total_bytes / 1024 / 1024:.1f} MB in {wall_seconds:.1f}s "
+          f"(sum of per-file times {serial_seconds:.1f}s)")
+
+def find_project_folder(service, slug):
+    """Latest existing YYYY-MM-DD_<slug> folder, so re-publishing reuses it."""
+    query = f"'{PARENT_FOLDER_ID}' in parents and name contains '{slug}' and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
+    folders = [
+        f for f in list_all(service, q=query, fields="files(id, name)", supportsAllDrives=True, includeItemsFromAllDrives=True)
+        if re.match(rf'^\d{{4}}-\d{{2}}-\d{{2}}_{re.escape(slug)}$', f['name'])
+    ]
+    if not folders:
+        return None
+    return max(folders, key=lambda f: f['name'])
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 upload_to_drive.py <slug>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Upload a slug's assets to its Drive project folder.")
+    parser.add_argument("slug")
+    parser.add_argument("--workers", type=int, default=UPLOAD_WORKERS, help="Concurrent uploads (env DRIVE_UPLOAD_WORKERS)")
+    parser.add_argument("--no-sync", action="store_true", help="Always create new files (no checksum dedup, no folder reuse)")
+    parser.add_argument("--report", help="Write the per-file timing/bytes report as JSON")
+    args = parser.parse_args()
 
-    slug = sys.argv[1]
+    slug = args.slug
     today = datetime.date.today().strftime("%Y-%m-%d")
     folder_name = f"{today}_{slug}"
     
     # 1. Authenticate (User OAuth)
-    service = authenticate()
+    service = get_service()
     
     # 2. Create Subfolder
     if not PARENT_FOLDER_ID:
         print("Error: GOOGLE_DRIVE_FOLDER_ID not found in environment.")
         sys.exit(1)
         
-    project_folder_id = create_folder(service, folder_name, PARENT_FOLDER_ID)
+    existing = None if args.no_sync else find_project_folder(service, slug)
+    if existing:
+        print(f"📂 Reusing project folder: {existing['name']}")
+        project_folder_id = existing['id']
+    else:
+        project_folder_id = create_folder(service, folder_name, PARENT_FOLDER_ID)
     
     # Standard Subfolders
-    clips_folder_id = create_folder(service, "clips", project_folder_id)
-    images_folder_id = create_folder(service, "images", project_folder_id)
+    subfolders = ensure_folders(service, ["clips", "images"], project_folder_id)
+    clips_folder_id = subfolders["clips"]
+    images_folder_id = subfolders["images"]
 
     # Placeholder for clips
     placeholder_path = "DROP_VEO_CLIPS_HERE.txt"
     if not os.path.exists(placeholder_path):
         with open(placeholder_path, "w") as f:
             f.write("スマホからVeoで生成した動画（mp4）を、ファイル名の先頭を数字にしてここにアップロードしてください。\n例: 1.mp4, 2_bridge.mp4 ...")
-    upload_file(service, placeholder_path, clips_folder_id)
 
     # 3. Upload Assets
     assets = [
-        (f"public/videos/{slug}.mp4", project_folder_id),            # V3 Video
-        (f"content/scripts/{slug}.md", project_folder_id),           # Script
-        (f"content/prompts/{slug}_prompts.md", project_folder_id),   # Prompts
-        (f"content/social/{slug}_posts.md", project_folder_id),      # Social Posts
-        (f"content/articles/{slug}.md", project_folder_id)           # Article Draft
+        (placeholder_path, clips_folder_id),                                         # Placeholder for clips
+        (f"public/videos/{slug}.mp4", project_folder_id),                              # V3 Video
+        (slug_resolver.resolve_or_default("scripts", slug), project_folder_id),      # Script
+        (slug_resolver.resolve_or_default("prompts", slug), project_folder_id),      # Prompts
+        (slug_resolver.resolve_or_default("social", slug), project_folder_id),       # Social Posts
+        (slug_resolver.resolve_or_default("articles", slug), project_folder_id)      # Article Draft
     ]
     
     # Sync Seed Images to images/ folder
@@ -226,11 +331,12 @@ def main():
     for img in articles_images:
         assets.append((img, images_folder_id))
 
-    for asset_path, target_id in assets:
-        if os.path.exists(asset_path):
-            upload_file(service, asset_path, target_id)
-        else:
-            print(f"⚠️ Skipping missing asset: {asset_path}")
+    started = time.time()
+    results = upload_assets(service, assets, args.workers, sync=not args.no_sync)
+    print_report(results, time.time() - started)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({"slug": slug, "results": results}, f, ensure_ascii=False, indent=2)
 
 if __name__ == '__main__':
     try:
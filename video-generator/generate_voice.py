@@ -1,16 +1,116 @@
 import asyncio
-import edge_tts
 import os
+import sys
+import json
 import argparse
 
+# Shared narration cache lives in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+import tts_cache
+import subtitle_timing
+
+DEFAULT_VOICE = "ja-JP-KeitaNeural"
+
+def load_manifest(manifest_path):
+    """Read a JSON array (or {"scenes": [...]}) or JSONL manifest of TTS jobs."""
+    if manifest_path == "-":
+        raw = sys.stdin.read()
+    else:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            raw = f.read()
+
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        # JSONL: one entry per line
+        data = [json.loads(line) for line in raw.splitlines() if line.strip()]
+
+    if isinstance(data, dict):
+        entries = data["scenes"] if "scenes" in data else [data]
+    else:
+        entries = data
+
+    for i, entry in enumerate(entries):
+        if not entry.get("text") or not entry.get("output"):
+            raise ValueError(f"Manifest entry {i} needs both 'text' and 'output'")
+        entry.setdefault("scene_id", i + 1)
+    return entries
+
+async def synthesize_batch(entries, default_voice, concurrency, retries):
+    """Synthesize every manifest entry in one interpreter. Results keep manifest order."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def worker(entry):
+        voice = entry.get("voice") or default_voice
+        output_file = entry["output"]
+        result = {"scene_id": entry["scene_id"], "output": output_file, "voice": voice}
+
+        attempts = max(1, retries)
+        async with semaphore:
+            for attempt in range(1, attempts + 1):
+                try:
+                    meta = await tts_cache.synthesize(entry["text"], voice, output_file)
+                    result["duration"] = meta["duration"]
+                    result["words"] = meta["words"]
+                    result["cached"] = meta["cached"]
+                    result["ok"] = True
+                    source = "cache" if meta["cached"] else "edge_tts"
+                    print(f"  ✅ Scene {entry['scene_id']}: {result['duration']:.2f}s ({source})", file=sys.stderr)
+                    return result
+                except Exception as e:
+                    print(f"  ⚠️ Scene {entry['scene_id']} attempt {attempt} failed: {e}", file=sys.stderr)
+                    result["error"] = str(e)
+                    if attempt < attempts:
+                        await asyncio.sleep(2 ** (attempt - 1))
+
+        result["ok"] = False
+        return result
+
+    return await asyncio.gather(*(worker(entry) for entry in entries))
+
 async def main():
     parser = argparse.ArgumentParser(description="Generate voice audio.")
-    parser.add_argument("--text", type=str, required=True, help="Text to speak")
+    parser.add_argument("--text", type=str, default=None, help="Text to speak")
     parser.add_argument("--output", type=str, default=None, help="Output file path")
-    parser.add_argument("--voice", type=str, default="ja-JP-KeitaNeural", help="Voice model")
-    
+    parser.add_argument("--voice", type=str, default=DEFAULT_VOICE, help="Voice model")
+    parser.add_argument("--batch", type=str, default=None,
+                        help="JSON/JSONL manifest of {scene_id, text, voice, output} entries ('-' for stdin)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel TTS requests in batch mode")
+    parser.add_argument("--retries", type=int, default=3, help="Attempts per scene in batch mode")
+    parser.add_argument("--subtitles", type=str, default=None,
+                        help="Write word-timed subtitles (.srt or .vtt); in batch mode scenes are laid end to end")
+    parser.add_argument("--print-duration", action="store_true",
+                        help="Single mode: print only the duration (seconds) on stdout, logs go to stderr")
+
     args = parser.parse_args()
 
+    if args.batch:
+        # Batch mode: logs go to stderr so stdout stays machine-readable JSON
+        entries = load_manifest(args.batch)
+        print(f"Generating audio for {len(entries)} scenes (concurrency={args.concurrency})", file=sys.stderr)
+        results = await synthesize_batch(entries, args.voice, args.concurrency, args.retries)
+        failed = [r for r in results if not r["ok"]]
+        if args.subtitles and not failed:
+            words, offset = [], 0.0
+            for r in results:
+                words += subtitle_timing.offset_words(r["words"], offset)
+                offset += r["duration"]
+            subtitle_timing.write_subtitles(args.subtitles, words)
+            print(f"Subtitles saved to {args.subtitles}", file=sys.stderr)
+        cache = tts_cache.get_cache()
+        print(json.dumps({
+            "results": results,
+            "total_duration": round(sum(r.get("duration", 0) for r in results), 3),
+            "failed": len(failed),
+            "cache": cache.stats() if cache else None,
+        }, ensure_ascii=False))
+        if failed:
+            sys.exit(1)
+        return
+
+    if not args.text:
+        parser.error("--text is required unless --batch is given")
+
     # Default output path relative to this script: ../video-generator/public/audio.mp3
     # But simpler: just default to "public/audio.mp3" relative to current dir, OR explicit path.
     # Let's determine robust default.
@@ -23,17 +123,20 @@ async def main():
         output_dir = os.path.join(script_dir, "public")
         output_file = os.path.join(output_dir, "audio.mp3")
 
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-    print(f"Generating audio for: '{args.text}'")
-    print(f"Voice: {args.voice}")
-    print(f"Output: {output_file}")
-    
-    communicate = edge_tts.Communicate(args.text, args.voice)
-    await communicate.save(output_file)
-    
-    print(f"Audio saved successfully.")
+    log = sys.stderr if args.print_duration else sys.stdout
+    print(f"Generating audio for: '{args.text}'", file=log)
+    print(f"Voice: {args.voice}", file=log)
+    print(f"Output: {output_file}", file=log)
+
+    meta = await tts_cache.synthesize(args.text, args.voice, output_file)
+
+    print(f"Audio saved successfully{' (from cache)' if meta['cached'] else ''}.", file=log)
+    if args.subtitles:
+        subtitle_timing.write_subtitles(args.subtitles, meta["words"])
+        print(f"Subtitles saved to {args.subtitles}", file=log)
+    if args.print_duration:
+        # Duration comes from the synthesis stream itself, no re-read of the MP3
+        print(meta["duration"])
 
 if __name__ == "__main__":
     asyncio.run(main())